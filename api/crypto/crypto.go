@@ -8,6 +8,7 @@ import (
 	"encoding/base64"
 	"errors"
 	"io"
+	"sync"
 )
 
 // deriveKey derives a 32-byte AES-256 key from the secret.
@@ -17,15 +18,31 @@ func deriveKey(secret string) []byte {
 	return h[:]
 }
 
-// EncryptCookie encrypts plaintext using AES-256-GCM. The nonce is prepended
-// to the ciphertext and the result is base64-encoded for safe DB storage.
-func EncryptCookie(plaintext, secret string) (string, error) {
-	key := deriveKey(secret)
-	block, err := aes.NewCipher(key)
+// aeads caches the AES-256-GCM AEAD per secret, so the key derivation and
+// key schedule run once per process instead of on every call.
+var aeads sync.Map // secret -> cipher.AEAD
+
+// aeadFor returns the AES-256-GCM AEAD for secret, building it on first use.
+func aeadFor(secret string) (cipher.AEAD, error) {
+	if v, ok := aeads.Load(secret); ok {
+		return v.(cipher.AEAD), nil
+	}
+	block, err := aes.NewCipher(deriveKey(secret))
 	if err != nil {
-		return "", err
+		return nil, err
 	}
 	gcm, err := cipher.NewGCM(block)
+	if err != nil {
+		return nil, err
+	}
+	v, _ := aeads.LoadOrStore(secret, gcm)
+	return v.(cipher.AEAD), nil
+}
+
+// EncryptCookie encrypts plaintext using AES-256-GCM. The nonce is prepended
+// to the ciphertext and the result is base64-encoded for safe DB storage.
+func EncryptCookie(plaintext, secret string) (string, error) {
+	gcm, err := aeadFor(secret)
 	if err != nil {
 		return "", err
 	}
@@ -39,16 +56,11 @@ func EncryptCookie(plaintext, secret string) (string, error) {
 
 // DecryptCookie reverses EncryptCookie: base64-decode, split nonce, decrypt.
 func DecryptCookie(encoded, secret string) (string, error) {
-	key := deriveKey(secret)
 	data, err := base64.StdEncoding.DecodeString(encoded)
 	if err != nil {
 		return "", err
 	}
-	block, err := aes.NewCipher(key)
-	if err != nil {
-		return "", err
-	}
-	gcm, err := cipher.NewGCM(block)
+	gcm, err := aeadFor(secret)
 	if err != nil {
 		return "", err
 	}
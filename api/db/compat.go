@@ -142,6 +142,15 @@ func (d *CompatDB) NowUTC() string {
 	return `strftime('%Y-%m-%dT%H:%M:%SZ', 'now')`
 }
 
+// NowPlusSecondsUTC returns a SQL expression for the current UTC time plus a
+// number of seconds bound to its ? placeholder, as ISO 8601 text.
+func (d *CompatDB) NowPlusSecondsUTC() string {
+	if d.IsPostgres() {
+		return `to_char((now() + make_interval(secs => ?)) AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"')`
+	}
+	return `strftime('%Y-%m-%dT%H:%M:%SZ', 'now', '+' || ? || ' seconds')`
+}
+
 // AgeHoursExpr returns a SQL expression computing "hours since <col>".
 func (d *CompatDB) AgeHoursExpr(col string) string {
 	if d.IsPostgres() {
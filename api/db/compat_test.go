@@ -99,6 +99,15 @@ func TestNowUTC(t *testing.T) {
 	}
 }
 
+func TestNowPlusSecondsUTC_HasPlaceholder(t *testing.T) {
+	if got := sqliteDB().NowPlusSecondsUTC(); !strings.Contains(got, "strftime") || strings.Count(got, "?") != 1 {
+		t.Errorf("SQLite NowPlusSecondsUTC = %q: expected strftime with one placeholder", got)
+	}
+	if got := pgDB().NowPlusSecondsUTC(); !strings.Contains(got, "make_interval") || strings.Count(got, "?") != 1 {
+		t.Errorf("Postgres NowPlusSecondsUTC = %q: expected make_interval with one placeholder", got)
+	}
+}
+
 func TestRandomFloat(t *testing.T) {
 	if got := sqliteDB().RandomFloat(); !strings.Contains(got, "RANDOM") {
 		t.Errorf("SQLite RandomFloat = %q", got)
@@ -1,12 +1,45 @@
 package feed
 
 import (
+	"bytes"
 	"encoding/binary"
 	"math"
 )
 
-// BlobToFloat32 converts a raw little-endian float32 blob to a Go slice.
+// Compact embedding encodings written by the worker. Each blob starts with a
+// 4-byte header that reads as a float32 NaN, which a raw float32 embedding
+// never begins with, so both kinds can share a column.
+var (
+	// Header, little-endian float32 scale, then one int8 per dimension
+	int8BlobHeader = []byte{'Q', '8', 0xc0, 0x7f}
+	// Header, then the top 16 bits of each little-endian float32
+	bf16BlobHeader = []byte{'B', 'F', 0xc0, 0x7f}
+)
+
+// BlobToFloat32 converts an embedding blob to a Go slice. Blobs are raw
+// little-endian float32, or one of the int8/bfloat16 encodings above.
 func BlobToFloat32(b []byte) []float32 {
+	if len(b) >= 4 && bytes.Equal(b[:4], int8BlobHeader) {
+		if len(b) <= 8 {
+			return nil
+		}
+		scale := math.Float32frombits(binary.LittleEndian.Uint32(b[4:8]))
+		out := make([]float32, len(b)-8)
+		for i, q := range b[8:] {
+			out[i] = float32(int8(q)) * scale
+		}
+		return out
+	}
+	if len(b) >= 4 && bytes.Equal(b[:4], bf16BlobHeader) {
+		if len(b) == 4 || len(b)%2 != 0 {
+			return nil
+		}
+		out := make([]float32, (len(b)-4)/2)
+		for i := range out {
+			out[i] = math.Float32frombits(uint32(binary.LittleEndian.Uint16(b[4+i*2:])) << 16)
+		}
+		return out
+	}
 	if len(b) == 0 || len(b)%4 != 0 {
 		return nil
 	}
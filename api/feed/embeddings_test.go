@@ -37,6 +37,42 @@ func TestBlobToFloat32_KnownValue(t *testing.T) {
 	}
 }
 
+func TestBlobToFloat32_Int8(t *testing.T) {
+	// scale 0.5 (0x3f000000), values 2, -4, 127
+	b := append([]byte{'Q', '8', 0xc0, 0x7f, 0x00, 0x00, 0x00, 0x3f}, 2, 0xfc, 0x7f)
+	got := BlobToFloat32(b)
+	want := []float32{1, -2, 63.5}
+	if len(got) != len(want) {
+		t.Fatalf("BlobToFloat32(int8) = %v, want %v", got, want)
+	}
+	for i := range want {
+		if got[i] != want[i] {
+			t.Errorf("[%d] = %v, want %v", i, got[i], want[i])
+		}
+	}
+}
+
+func TestBlobToFloat32_BFloat16(t *testing.T) {
+	// 1.0 = 0x3f80, -2.0 = 0xc000
+	b := []byte{'B', 'F', 0xc0, 0x7f, 0x80, 0x3f, 0x00, 0xc0}
+	got := BlobToFloat32(b)
+	if len(got) != 2 || got[0] != 1 || got[1] != -2 {
+		t.Errorf("BlobToFloat32(bf16) = %v, want [1 -2]", got)
+	}
+}
+
+func TestBlobToFloat32_TruncatedEncodings(t *testing.T) {
+	for _, b := range [][]byte{
+		{'Q', '8', 0xc0, 0x7f, 0x00, 0x00, 0x00, 0x3f},
+		{'B', 'F', 0xc0, 0x7f},
+		{'B', 'F', 0xc0, 0x7f, 0x80},
+	} {
+		if got := BlobToFloat32(b); got != nil {
+			t.Errorf("BlobToFloat32(%v) = %v, want nil", b, got)
+		}
+	}
+}
+
 // ---------------------------------------------------------------------------
 // Float32ToBlob
 // ---------------------------------------------------------------------------
@@ -353,10 +353,12 @@ func main() {
 		r.Put("/api/internal/jobs/{id}", workerH.HandleUpdateJob)
 		r.Get("/api/internal/jobs/{id}", workerH.HandleGetJob)
 		r.Post("/api/internal/jobs/{id}/heartbeat", workerH.HandleHeartbeat)
+		r.Post("/api/internal/jobs/heartbeat", workerH.HandleHeartbeatBatch)
 		r.Post("/api/internal/jobs/reclaim", workerH.HandleReclaimStale)
 		r.Put("/api/internal/sources/{id}", workerH.HandleUpdateSource)
 		r.Get("/api/internal/sources/{id}/cookie", workerH.HandleGetCookie)
 		r.Post("/api/internal/clips", workerH.HandleCreateClip)
+		r.Post("/api/internal/clips/bulk", workerH.HandleCreateClipsBulk)
 		r.Post("/api/internal/topics/resolve", workerH.HandleResolveTopic)
 		r.Post("/api/internal/scores/update", workerH.HandleScoreUpdate)
 		r.Post("/api/internal/llm-logs", workerH.HandleCreateLLMLog)
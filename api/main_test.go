@@ -13,6 +13,7 @@ import (
 	"clipfeed/auth"
 	"clipfeed/clips"
 	"clipfeed/collections"
+	"clipfeed/crypto"
 	"clipfeed/db"
 	"clipfeed/feed"
 	"clipfeed/httputil"
@@ -892,6 +893,250 @@ func TestWorkerAuth_InvalidSecret(t *testing.T) {
 	}
 }
 
+func TestHeartbeatBatch_OnlyRunningJobs(t *testing.T) {
+	h := newTestHandlers(t)
+	for _, j := range []struct{ id, status string }{
+		{"job-a", "running"}, {"job-b", "running"}, {"job-c", "cancelled"},
+	} {
+		if _, err := h.db.Exec(`INSERT INTO jobs (id, job_type, status) VALUES (?, 'download', ?)`, j.id, j.status); err != nil {
+			t.Fatalf("insert job: %v", err)
+		}
+	}
+
+	b, _ := json.Marshal(map[string]interface{}{"job_ids": []string{"job-a", "job-c", "job-missing"}})
+	req := httptest.NewRequest("POST", "/api/internal/jobs/heartbeat", bytes.NewReader(b))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleHeartbeatBatch(rec, req)
+	if rec.Code != 200 {
+		t.Fatalf("status = %d, want 200; body: %s", rec.Code, rec.Body.String())
+	}
+	running := decodeJSON(t, rec)["running"].([]interface{})
+	if len(running) != 1 || running[0] != "job-a" {
+		t.Fatalf("running = %v, want [job-a]", running)
+	}
+
+	var hbA, hbB sql.NullString
+	h.db.QueryRow(`SELECT heartbeat_at FROM jobs WHERE id = 'job-a'`).Scan(&hbA)
+	h.db.QueryRow(`SELECT heartbeat_at FROM jobs WHERE id = 'job-b'`).Scan(&hbB)
+	if !hbA.Valid {
+		t.Error("job-a heartbeat_at not set")
+	}
+	if hbB.Valid {
+		t.Error("job-b heartbeat_at set although it was not in the request")
+	}
+}
+
+func TestHeartbeatBatch_Empty(t *testing.T) {
+	h := newTestHandlers(t)
+	req := httptest.NewRequest("POST", "/api/internal/jobs/heartbeat", bytes.NewReader([]byte(`{"job_ids": []}`)))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleHeartbeatBatch(rec, req)
+	if rec.Code != 200 {
+		t.Fatalf("status = %d, want 200", rec.Code)
+	}
+	if running := decodeJSON(t, rec)["running"].([]interface{}); len(running) != 0 {
+		t.Errorf("running = %v, want []", running)
+	}
+}
+
+func TestCreateClipsBulk(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO sources (id, url, platform) VALUES ('src-bulk', 'http://x.com', 'direct')`)
+
+	clip := func(id string) map[string]interface{} {
+		return map[string]interface{}{
+			"id": id, "source_id": "src-bulk", "title": "Clip " + id, "duration_seconds": 30.0,
+			"storage_key": "clips/" + id + "/clip.mp4", "transcript": "hello world",
+			"topics": []string{"bulk topic"}, "expires_at": "2099-01-01T00:00:00Z",
+		}
+	}
+	b, _ := json.Marshal(map[string]interface{}{"clips": []interface{}{clip("bulk-1"), clip("bulk-2")}})
+	req := httptest.NewRequest("POST", "/api/internal/clips/bulk", bytes.NewReader(b))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleCreateClipsBulk(rec, req)
+	if rec.Code != 201 {
+		t.Fatalf("status = %d, want 201; body: %s", rec.Code, rec.Body.String())
+	}
+	if ids := decodeJSON(t, rec)["ids"].([]interface{}); len(ids) != 2 {
+		t.Fatalf("ids = %v, want 2", ids)
+	}
+
+	var clips, clipTopics int
+	h.db.QueryRow(`SELECT COUNT(*) FROM clips WHERE source_id = 'src-bulk'`).Scan(&clips)
+	h.db.QueryRow(`SELECT COUNT(*) FROM clip_topics WHERE clip_id IN ('bulk-1', 'bulk-2')`).Scan(&clipTopics)
+	if clips != 2 || clipTopics != 2 {
+		t.Errorf("clips = %d, clip_topics = %d, want 2 and 2", clips, clipTopics)
+	}
+
+	// A duplicate id only drops that clip from the batch
+	b, _ = json.Marshal(map[string]interface{}{"clips": []interface{}{clip("bulk-3"), clip("bulk-1")}})
+	rec = httptest.NewRecorder()
+	h.workerH.HandleCreateClipsBulk(rec, httptest.NewRequest("POST", "/api/internal/clips/bulk", bytes.NewReader(b)))
+	if rec.Code != 201 {
+		t.Fatalf("status = %d, want 201; body: %s", rec.Code, rec.Body.String())
+	}
+	if ids := decodeJSON(t, rec)["ids"].([]interface{}); len(ids) != 1 || ids[0] != "bulk-3" {
+		t.Fatalf("ids = %v, want [bulk-3]", ids)
+	}
+	h.db.QueryRow(`SELECT COUNT(*) FROM clips WHERE source_id = 'src-bulk'`).Scan(&clips)
+	h.db.QueryRow(`SELECT COUNT(*) FROM clip_topics WHERE clip_id IN ('bulk-1', 'bulk-2', 'bulk-3')`).Scan(&clipTopics)
+	if clips != 3 || clipTopics != 3 {
+		t.Errorf("clips = %d, clip_topics = %d, want 3 and 3", clips, clipTopics)
+	}
+}
+
+func TestCreateClipExistingIDConflicts(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO sources (id, url, platform) VALUES ('src-dup', 'http://x.com', 'direct')`)
+
+	b, _ := json.Marshal(map[string]interface{}{
+		"id": "dup-1", "source_id": "src-dup", "title": "Clip", "duration_seconds": 30.0,
+		"storage_key": "clips/dup-1/clip.mp4", "topics": []string{"dup topic"},
+		"expires_at": "2099-01-01T00:00:00Z",
+	})
+	for i, want := range []int{201, 409} {
+		rec := httptest.NewRecorder()
+		h.workerH.HandleCreateClip(rec, httptest.NewRequest("POST", "/api/internal/clips", bytes.NewReader(b)))
+		if rec.Code != want {
+			t.Fatalf("attempt %d: status = %d, want %d; body: %s", i+1, rec.Code, want, rec.Body.String())
+		}
+		if id := decodeJSON(t, rec)["id"]; id != "dup-1" {
+			t.Errorf("attempt %d: id = %v, want dup-1", i+1, id)
+		}
+	}
+}
+
+func TestCreateClipsBulkTopicCacheSkipsRolledBackTopics(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO sources (id, url, platform) VALUES ('src-tc', 'http://x.com', 'direct')`)
+	// Fail tc-1 after its topics have been created inside its savepoint
+	h.db.Exec(`CREATE TRIGGER fail_tc1 BEFORE INSERT ON clip_topics WHEN NEW.clip_id = 'tc-1'
+		BEGIN SELECT RAISE(ABORT, 'boom'); END`)
+
+	post := func(ids ...string) []interface{} {
+		var clips []interface{}
+		for _, id := range ids {
+			clips = append(clips, map[string]interface{}{
+				"id": id, "source_id": "src-tc", "title": "Clip " + id, "duration_seconds": 30.0,
+				"storage_key": "clips/" + id + "/clip.mp4", "topics": []string{"fresh topic"},
+				"expires_at": "2099-01-01T00:00:00Z",
+			})
+		}
+		b, _ := json.Marshal(map[string]interface{}{"clips": clips})
+		rec := httptest.NewRecorder()
+		h.workerH.HandleCreateClipsBulk(rec, httptest.NewRequest("POST", "/api/internal/clips/bulk", bytes.NewReader(b)))
+		if rec.Code != 201 {
+			t.Fatalf("status = %d, want 201; body: %s", rec.Code, rec.Body.String())
+		}
+		return decodeJSON(t, rec)["ids"].([]interface{})
+	}
+
+	if ids := post("tc-1", "tc-2"); len(ids) != 1 || ids[0] != "tc-2" {
+		t.Fatalf("ids = %v, want [tc-2]", ids)
+	}
+	post("tc-3")
+
+	var linked, dangling int
+	h.db.QueryRow(`SELECT COUNT(*) FROM clip_topics WHERE clip_id IN ('tc-2', 'tc-3')`).Scan(&linked)
+	h.db.QueryRow(`SELECT COUNT(*) FROM clip_topics ct LEFT JOIN topics t ON t.id = ct.topic_id
+		WHERE ct.clip_id IN ('tc-2', 'tc-3') AND t.id IS NULL`).Scan(&dangling)
+	if linked != 2 || dangling != 0 {
+		t.Errorf("clip_topics = %d (dangling %d), want 2 (0)", linked, dangling)
+	}
+}
+
+func TestRequeueJobRetryAfterUsesDBClock(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO jobs (id, job_type, status, attempts) VALUES ('job-retry', 'ingest', 'running', 1)`)
+
+	req := httptest.NewRequest("PUT", "/api/internal/jobs/job-retry",
+		bytes.NewReader([]byte(`{"status": "queued", "error": "HTTP 429", "retry_after_seconds": 120}`)))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleUpdateJob(rec, withChiParam(req, "id", "job-retry"))
+	if rec.Code != 200 {
+		t.Fatalf("status = %d, want 200; body: %s", rec.Code, rec.Body.String())
+	}
+
+	var status string
+	var delay float64
+	h.db.QueryRow(`SELECT status, (julianday(run_after) - julianday('now')) * 86400 FROM jobs WHERE id = 'job-retry'`).
+		Scan(&status, &delay)
+	if status != "queued" {
+		t.Errorf("status = %q, want queued", status)
+	}
+	if delay < 110 || delay > 125 {
+		t.Errorf("run_after is %.0fs from now, want ~120s", delay)
+	}
+}
+
+func TestUpdateJobSetsSourceStatus(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO sources (id, url, platform, status) VALUES ('src-job', 'http://x.com', 'direct', 'processing')`)
+	h.db.Exec(`INSERT INTO jobs (id, source_id, job_type, status, attempts) VALUES ('job-src', 'src-job', 'ingest', 'running', 1)`)
+
+	req := httptest.NewRequest("PUT", "/api/internal/jobs/job-src",
+		bytes.NewReader([]byte(`{"status": "complete", "result": {"clip_count": 2}, "source_status": "complete"}`)))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleUpdateJob(rec, withChiParam(req, "id", "job-src"))
+	if rec.Code != 200 {
+		t.Fatalf("status = %d, want 200; body: %s", rec.Code, rec.Body.String())
+	}
+
+	var jobStatus, sourceStatus string
+	h.db.QueryRow(`SELECT status FROM jobs WHERE id = 'job-src'`).Scan(&jobStatus)
+	h.db.QueryRow(`SELECT status FROM sources WHERE id = 'src-job'`).Scan(&sourceStatus)
+	if jobStatus != "complete" || sourceStatus != "complete" {
+		t.Errorf("job status = %q, source status = %q, want complete for both", jobStatus, sourceStatus)
+	}
+}
+
+func TestReclaimStaleJobs(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO jobs (id, job_type, status, attempts, max_attempts, started_at) VALUES
+		('stale-retry', 'ingest', 'running', 1, 3, '2000-01-01T00:00:00Z'),
+		('stale-spent', 'ingest', 'running', 3, 3, '2000-01-01T00:00:00Z'),
+		('fresh', 'ingest', 'running', 1, 3, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))`)
+
+	req := httptest.NewRequest("POST", "/api/internal/jobs/reclaim", bytes.NewReader([]byte(`{"stale_minutes": 30}`)))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleReclaimStale(rec, req)
+	if rec.Code != 200 {
+		t.Fatalf("status = %d, want 200; body: %s", rec.Code, rec.Body.String())
+	}
+	resp := decodeJSON(t, rec)
+	if resp["requeued"].(float64) != 1 || resp["failed"].(float64) != 1 {
+		t.Errorf("requeued = %v, failed = %v, want 1 and 1", resp["requeued"], resp["failed"])
+	}
+
+	want := map[string]string{"stale-retry": "queued", "stale-spent": "failed", "fresh": "running"}
+	for id, status := range want {
+		var got string
+		var runAfter, completedAt sql.NullString
+		h.db.QueryRow(`SELECT status, run_after, completed_at FROM jobs WHERE id = ?`, id).Scan(&got, &runAfter, &completedAt)
+		if got != status {
+			t.Errorf("%s: status = %q, want %q", id, got, status)
+		}
+		if runAfter.Valid != (status == "queued") || completedAt.Valid != (status == "failed") {
+			t.Errorf("%s: run_after set = %v, completed_at set = %v", id, runAfter.Valid, completedAt.Valid)
+		}
+	}
+}
+
+func TestReclaimStaleJobsReportsDBError(t *testing.T) {
+	h := newTestHandlers(t)
+	h.db.Exec(`INSERT INTO jobs (id, job_type, status, attempts, max_attempts, started_at) VALUES
+		('stale-err', 'ingest', 'running', 1, 3, '2000-01-01T00:00:00Z')`)
+	h.db.Exec(`CREATE TRIGGER fail_reclaim BEFORE UPDATE ON jobs
+		BEGIN SELECT RAISE(ABORT, 'boom'); END`)
+
+	req := httptest.NewRequest("POST", "/api/internal/jobs/reclaim", bytes.NewReader([]byte(`{"stale_minutes": 30}`)))
+	rec := httptest.NewRecorder()
+	h.workerH.HandleReclaimStale(rec, req)
+	if rec.Code != 500 {
+		t.Fatalf("status = %d, want 500; body: %s", rec.Code, rec.Body.String())
+	}
+}
+
 // --- Scout ---
 
 func TestScoutSourceCRUD(t *testing.T) {
@@ -956,3 +1201,20 @@ func TestTruncate(t *testing.T) {
 		t.Errorf("Truncate = %q, want %q", got, "hi")
 	}
 }
+
+// --- Cookie encryption ---
+
+func TestCookieEncryptionRoundTrip(t *testing.T) {
+	for i := 0; i < 2; i++ { // second pass uses the cached cipher
+		enc, err := crypto.EncryptCookie("session=abc", "secret-a")
+		if err != nil {
+			t.Fatalf("EncryptCookie: %v", err)
+		}
+		if got, err := crypto.DecryptCookie(enc, "secret-a"); err != nil || got != "session=abc" {
+			t.Fatalf("DecryptCookie = %q, %v; want %q", got, err, "session=abc")
+		}
+		if _, err := crypto.DecryptCookie(enc, "secret-b"); err == nil {
+			t.Fatal("DecryptCookie with another secret succeeded")
+		}
+	}
+}
@@ -9,6 +9,7 @@ import (
 	"log"
 	"net/http"
 	"strings"
+	"sync"
 
 	"clipfeed/crypto"
 	"clipfeed/db"
@@ -23,6 +24,37 @@ type Handler struct {
 	DB           *db.CompatDB
 	WorkerSecret string
 	CookieSecret string
+
+	topics topicCache
+}
+
+// topicCache maps topic names to IDs across clip inserts. Topics are never
+// deleted, so entries stay valid; IDs resolved inside a transaction are only
+// added once it commits.
+type topicCache struct {
+	mu  sync.RWMutex
+	ids map[string]string
+}
+
+func (c *topicCache) get(name string) (string, bool) {
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	id, ok := c.ids[name]
+	return id, ok
+}
+
+func (c *topicCache) addAll(ids map[string]string) {
+	if len(ids) == 0 {
+		return
+	}
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if c.ids == nil {
+		c.ids = make(map[string]string, len(ids))
+	}
+	for name, id := range ids {
+		c.ids[name] = id
+	}
 }
 
 // WorkerAuthMiddleware validates requests from the ingestion worker.
@@ -87,52 +119,75 @@ func (h *Handler) HandleUpdateJob(w http.ResponseWriter, r *http.Request) {
 		Error    *string          `json:"error,omitempty"`
 		Result   *json.RawMessage `json:"result,omitempty"`
 		RunAfter *string          `json:"run_after,omitempty"`
+		// Retry delay; run_after is then computed by the database clock
+		RetryAfterSeconds *int `json:"retry_after_seconds,omitempty"`
+		// Status for the job's source, written in the same transaction
+		SourceStatus *string `json:"source_status,omitempty"`
 	}
 	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
 		httputil.WriteJSON(w, 400, map[string]string{"error": "invalid request body"})
 		return
 	}
 
+	errStr := ""
+	if req.Error != nil {
+		errStr = *req.Error
+	}
+
+	var query, errMsg string
+	var args []interface{}
 	switch req.Status {
 	case "complete", "failed", "rejected", "cancelled":
 		resultStr := "{}"
 		if req.Result != nil {
 			resultStr = string(*req.Result)
 		}
-		errStr := ""
-		if req.Error != nil {
-			errStr = *req.Error
-		}
-		_, err := h.DB.ExecContext(r.Context(), fmt.Sprintf(`
+		query = fmt.Sprintf(`
 			UPDATE jobs SET status = ?, error = ?, result = ?, completed_at = %s WHERE id = ?
-		`, nowExpr), req.Status, errStr, resultStr, jobID)
-		if err != nil {
-			httputil.WriteJSON(w, 500, map[string]string{"error": "failed to update job"})
-			return
-		}
+		`, nowExpr)
+		args = []interface{}{req.Status, errStr, resultStr, jobID}
+		errMsg = "failed to update job"
 
 	case "queued":
-		runAfter := ""
-		if req.RunAfter != nil {
+		runAfterExpr := "?"
+		var runAfter interface{} = ""
+		if req.RetryAfterSeconds != nil {
+			runAfterExpr = h.DB.NowPlusSecondsUTC()
+			runAfter = *req.RetryAfterSeconds
+		} else if req.RunAfter != nil {
 			runAfter = *req.RunAfter
 		}
-		errStr := ""
-		if req.Error != nil {
-			errStr = *req.Error
-		}
-		_, err := h.DB.ExecContext(r.Context(),
-			`UPDATE jobs SET status = 'queued', error = ?, run_after = ? WHERE id = ?`,
-			errStr, runAfter, jobID)
-		if err != nil {
-			httputil.WriteJSON(w, 500, map[string]string{"error": "failed to re-queue job"})
-			return
-		}
+		query = fmt.Sprintf(
+			`UPDATE jobs SET status = 'queued', error = ?, run_after = %s WHERE id = ?`, runAfterExpr)
+		args = []interface{}{errStr, runAfter, jobID}
+		errMsg = "failed to re-queue job"
 
 	default:
 		httputil.WriteJSON(w, 400, map[string]string{"error": "invalid status"})
 		return
 	}
 
+	var err error
+	if req.SourceStatus == nil {
+		_, err = h.DB.ExecContext(r.Context(), query, args...)
+	} else {
+		// One commit for both rows instead of a second request and write
+		err = db.WithTx(r.Context(), h.DB, func(conn *db.CompatConn) error {
+			if _, err := conn.ExecContext(r.Context(), query, args...); err != nil {
+				return err
+			}
+			_, err := conn.ExecContext(r.Context(),
+				`UPDATE sources SET status = ? WHERE id = (SELECT source_id FROM jobs WHERE id = ?)`,
+				*req.SourceStatus, jobID)
+			return err
+		})
+	}
+	if err != nil {
+		log.Printf("worker update job %s failed: %v", jobID, err)
+		httputil.WriteJSON(w, 500, map[string]string{"error": errMsg})
+		return
+	}
+
 	httputil.WriteJSON(w, 200, map[string]string{"status": "updated"})
 }
 
@@ -156,6 +211,56 @@ func (h *Handler) HandleHeartbeat(w http.ResponseWriter, r *http.Request) {
 	httputil.WriteJSON(w, 200, map[string]string{"status": "ok"})
 }
 
+// maxHeartbeatBatch bounds the job IDs accepted by one bulk heartbeat.
+const maxHeartbeatBatch = 256
+
+// HandleHeartbeatBatch refreshes heartbeat_at for several running jobs in a
+// single statement and reports which of them are still running, so a worker
+// can heartbeat all of its in-flight jobs with one request.
+func (h *Handler) HandleHeartbeatBatch(w http.ResponseWriter, r *http.Request) {
+	var req struct {
+		JobIDs []string `json:"job_ids"`
+	}
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		httputil.WriteJSON(w, 400, map[string]string{"error": "invalid request body"})
+		return
+	}
+	if len(req.JobIDs) > maxHeartbeatBatch {
+		httputil.WriteJSON(w, 400, map[string]string{"error": fmt.Sprintf("at most %d job_ids per request", maxHeartbeatBatch)})
+		return
+	}
+	running := make([]string, 0, len(req.JobIDs))
+	if len(req.JobIDs) == 0 {
+		httputil.WriteJSON(w, 200, map[string]interface{}{"running": running})
+		return
+	}
+
+	args := make([]interface{}, len(req.JobIDs))
+	for i, id := range req.JobIDs {
+		args[i] = id
+	}
+	placeholders := strings.TrimSuffix(strings.Repeat("?, ", len(req.JobIDs)), ", ")
+	rows, err := h.DB.QueryContext(r.Context(), fmt.Sprintf(`
+		UPDATE jobs SET heartbeat_at = %s WHERE status = 'running' AND id IN (%s) RETURNING id
+	`, h.DB.NowUTC(), placeholders), args...)
+	if err != nil {
+		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to update heartbeats"})
+		return
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var id string
+		if err := rows.Scan(&id); err == nil {
+			running = append(running, id)
+		}
+	}
+	if err := rows.Err(); err != nil {
+		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to update heartbeats"})
+		return
+	}
+	httputil.WriteJSON(w, 200, map[string]interface{}{"running": running})
+}
+
 // HandleGetJob returns a job's status and attempt info.
 func (h *Handler) HandleGetJob(w http.ResponseWriter, r *http.Request) {
 	jobID := chi.URLParam(r, "id")
@@ -184,55 +289,43 @@ func (h *Handler) HandleReclaimStale(w http.ResponseWriter, r *http.Request) {
 
 	nowExpr := h.DB.NowUTC()
 	staleMsg := fmt.Sprintf("stale watchdog: recovered running job older than %dm", req.StaleMinutes)
+	staleExpr := h.DB.PurgeDatetimeComparison("COALESCE(heartbeat_at, started_at)", fmt.Sprintf("-%d minutes", req.StaleMinutes))
 
+	// One pass over the running jobs: requeue those with attempts left, fail the rest
 	var requeuedCount, failedCount int
-
-	if h.DB.IsPostgres() {
-		cutoffExpr := fmt.Sprintf("now() - interval '%d minutes'", req.StaleMinutes)
-		res, _ := h.DB.ExecContext(r.Context(), fmt.Sprintf(`
-			UPDATE jobs SET status = 'queued', run_after = %s,
-			    error = CASE WHEN error IS NULL OR error = '' THEN $1 ELSE error || ' | ' || $1 END
-			WHERE status = 'running' AND started_at IS NOT NULL
-			  AND COALESCE(heartbeat_at, started_at)::timestamptz <= %s AND attempts < max_attempts
-		`, nowExpr, cutoffExpr), staleMsg)
-		if res != nil {
-			n, _ := res.RowsAffected()
-			requeuedCount = int(n)
-		}
-		res, _ = h.DB.ExecContext(r.Context(), fmt.Sprintf(`
-			UPDATE jobs SET status = 'failed', completed_at = %s,
-			    error = CASE WHEN error IS NULL OR error = '' THEN $1 ELSE error || ' | ' || $1 END
-			WHERE status = 'running' AND started_at IS NOT NULL
-			  AND COALESCE(heartbeat_at, started_at)::timestamptz <= %s AND attempts >= max_attempts
-		`, nowExpr, cutoffExpr), staleMsg)
-		if res != nil {
-			n, _ := res.RowsAffected()
-			failedCount = int(n)
-		}
-	} else {
-		cutoff := fmt.Sprintf("-%d minutes", req.StaleMinutes)
-		staleExpr := h.DB.PurgeDatetimeComparison("COALESCE(heartbeat_at, started_at)", cutoff)
-		res, _ := h.DB.ExecContext(r.Context(), fmt.Sprintf(`
-			UPDATE jobs SET status = 'queued', run_after = %s,
-			    error = CASE WHEN error IS NULL OR error = '' THEN ? ELSE error || ' | ' || ? END
-			WHERE status = 'running' AND started_at IS NOT NULL
-			  AND %s AND attempts < max_attempts
-		`, nowExpr, staleExpr), staleMsg, staleMsg)
-		if res != nil {
-			n, _ := res.RowsAffected()
-			requeuedCount = int(n)
+	rows, err := h.DB.QueryContext(r.Context(), fmt.Sprintf(`
+		UPDATE jobs SET
+		    status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+		    run_after = CASE WHEN attempts < max_attempts THEN %[1]s ELSE run_after END,
+		    completed_at = CASE WHEN attempts < max_attempts THEN completed_at ELSE %[1]s END,
+		    error = CASE WHEN error IS NULL OR error = '' THEN ? ELSE error || ' | ' || ? END
+		WHERE status = 'running' AND started_at IS NOT NULL AND %[2]s
+		RETURNING status
+	`, nowExpr, staleExpr), staleMsg, staleMsg)
+	if err != nil {
+		log.Printf("worker reclaim stale jobs failed: %v", err)
+		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to reclaim stale jobs"})
+		return
+	}
+	defer rows.Close()
+	for rows.Next() {
+		var status string
+		if err := rows.Scan(&status); err != nil {
+			log.Printf("worker reclaim stale jobs: scan failed: %v", err)
+			httputil.WriteJSON(w, 500, map[string]string{"error": "failed to reclaim stale jobs"})
+			return
 		}
-		res, _ = h.DB.ExecContext(r.Context(), fmt.Sprintf(`
-			UPDATE jobs SET status = 'failed', completed_at = %s,
-			    error = CASE WHEN error IS NULL OR error = '' THEN ? ELSE error || ' | ' || ? END
-			WHERE status = 'running' AND started_at IS NOT NULL
-			  AND %s AND attempts >= max_attempts
-		`, nowExpr, staleExpr), staleMsg, staleMsg)
-		if res != nil {
-			n, _ := res.RowsAffected()
-			failedCount = int(n)
+		if status == "queued" {
+			requeuedCount++
+		} else {
+			failedCount++
 		}
 	}
+	if err := rows.Err(); err != nil {
+		log.Printf("worker reclaim stale jobs failed: %v", err)
+		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to reclaim stale jobs"})
+		return
+	}
 
 	httputil.WriteJSON(w, 200, map[string]interface{}{
 		"requeued": requeuedCount, "failed": failedCount,
@@ -332,93 +425,192 @@ func (h *Handler) HandleGetCookie(w http.ResponseWriter, r *http.Request) {
 	httputil.WriteJSON(w, 200, map[string]interface{}{"cookie": decrypted})
 }
 
+// createClipRequest is the body of a clip creation, alone or as part of a bulk request.
+type createClipRequest struct {
+	ID              string   `json:"id"`
+	SourceID        string   `json:"source_id"`
+	Title           string   `json:"title"`
+	DurationSeconds float64  `json:"duration_seconds"`
+	StartTime       float64  `json:"start_time"`
+	EndTime         float64  `json:"end_time"`
+	StorageKey      string   `json:"storage_key"`
+	ThumbnailKey    string   `json:"thumbnail_key"`
+	Width           int      `json:"width"`
+	Height          int      `json:"height"`
+	FileSizeBytes   int64    `json:"file_size_bytes"`
+	Transcript      string   `json:"transcript"`
+	Topics          []string `json:"topics"`
+	ContentScore    float64  `json:"content_score"`
+	ExpiresAt       string   `json:"expires_at"`
+	Platform        string   `json:"platform"`
+	ChannelName     string   `json:"channel_name"`
+	TextEmbedding   string   `json:"text_embedding,omitempty"`
+	VisualEmbedding string   `json:"visual_embedding,omitempty"`
+	ModelVersion    string   `json:"model_version,omitempty"`
+}
+
+// insertClipTx writes a clip with its topics, FTS row and embeddings. Topic
+// IDs not already cached are looked up or created and recorded in resolved,
+// for the caller to cache once the transaction commits.
+func (h *Handler) insertClipTx(ctx context.Context, conn *db.CompatConn, req *createClipRequest, resolved map[string]string) error {
+	topicsJSON, _ := json.Marshal(req.Topics)
+
+	if _, err := conn.ExecContext(ctx, `
+		INSERT INTO clips (
+			id, source_id, title, duration_seconds, start_time, end_time,
+			storage_key, thumbnail_key, width, height, file_size_bytes,
+			transcript, topics, content_score, expires_at, status
+		) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'ready')
+	`, req.ID, req.SourceID, req.Title, req.DurationSeconds, req.StartTime, req.EndTime,
+		req.StorageKey, req.ThumbnailKey, req.Width, req.Height, req.FileSizeBytes,
+		req.Transcript, string(topicsJSON), req.ContentScore, req.ExpiresAt,
+	); err != nil {
+		return fmt.Errorf("insert clip: %w", err)
+	}
+
+	var rows []string
+	var args []interface{}
+	for _, topicName := range req.Topics {
+		topicID, ok := resolved[topicName]
+		if !ok {
+			topicID, ok = h.topics.get(topicName)
+		}
+		if !ok {
+			topicID = ResolveOrCreateTopicTx(ctx, conn, topicName)
+			if topicID != "" {
+				resolved[topicName] = topicID
+			}
+		}
+		if topicID != "" {
+			rows = append(rows, "(?, ?, 1.0, 'keybert')")
+			args = append(args, req.ID, topicID)
+		}
+	}
+	if len(rows) > 0 {
+		if _, err := conn.ExecContext(ctx,
+			`INSERT INTO clip_topics (clip_id, topic_id, confidence, source) VALUES `+strings.Join(rows, ", ")+` ON CONFLICT DO NOTHING`,
+			args...); err != nil {
+			return fmt.Errorf("insert clip_topics: %w", err)
+		}
+	}
+
+	if _, err := conn.ExecContext(ctx,
+		`INSERT INTO clips_fts(clip_id, title, transcript, platform, channel_name) VALUES (?, ?, ?, ?, ?)`,
+		req.ID, req.Title, Truncate(req.Transcript, 2000), req.Platform, req.ChannelName); err != nil {
+		return fmt.Errorf("insert clips_fts: %w", err)
+	}
+
+	if req.TextEmbedding != "" || req.VisualEmbedding != "" {
+		var textEmb, visEmb []byte
+		if req.TextEmbedding != "" {
+			textEmb, _ = base64.StdEncoding.DecodeString(req.TextEmbedding)
+		}
+		if req.VisualEmbedding != "" {
+			visEmb, _ = base64.StdEncoding.DecodeString(req.VisualEmbedding)
+		}
+		if _, err := conn.ExecContext(ctx,
+			`INSERT INTO clip_embeddings (clip_id, text_embedding, visual_embedding, model_version) VALUES (?, ?, ?, ?)
+			 ON CONFLICT(clip_id) DO UPDATE SET text_embedding = EXCLUDED.text_embedding, visual_embedding = EXCLUDED.visual_embedding, model_version = EXCLUDED.model_version`,
+			req.ID, textEmb, visEmb, req.ModelVersion); err != nil {
+			return fmt.Errorf("insert clip_embeddings: %w", err)
+		}
+	}
+
+	return nil
+}
+
 // HandleCreateClip creates a clip with associated topics, embeddings, and FTS.
 func (h *Handler) HandleCreateClip(w http.ResponseWriter, r *http.Request) {
-	var req struct {
-		ID              string   `json:"id"`
-		SourceID        string   `json:"source_id"`
-		Title           string   `json:"title"`
-		DurationSeconds float64  `json:"duration_seconds"`
-		StartTime       float64  `json:"start_time"`
-		EndTime         float64  `json:"end_time"`
-		StorageKey      string   `json:"storage_key"`
-		ThumbnailKey    string   `json:"thumbnail_key"`
-		Width           int      `json:"width"`
-		Height          int      `json:"height"`
-		FileSizeBytes   int64    `json:"file_size_bytes"`
-		Transcript      string   `json:"transcript"`
-		Topics          []string `json:"topics"`
-		ContentScore    float64  `json:"content_score"`
-		ExpiresAt       string   `json:"expires_at"`
-		Platform        string   `json:"platform"`
-		ChannelName     string   `json:"channel_name"`
-		TextEmbedding   string   `json:"text_embedding,omitempty"`
-		VisualEmbedding string   `json:"visual_embedding,omitempty"`
-		ModelVersion    string   `json:"model_version,omitempty"`
-	}
+	var req createClipRequest
 	r.Body = http.MaxBytesReader(w, r.Body, 10<<20)
 	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
 		httputil.WriteJSON(w, 400, map[string]string{"error": "invalid request body"})
 		return
 	}
 
+	resolved := make(map[string]string)
 	if err := db.WithTx(r.Context(), h.DB, func(conn *db.CompatConn) error {
-		topicsJSON, _ := json.Marshal(req.Topics)
-
-		if _, err := conn.ExecContext(r.Context(), `
-			INSERT INTO clips (
-				id, source_id, title, duration_seconds, start_time, end_time,
-				storage_key, thumbnail_key, width, height, file_size_bytes,
-				transcript, topics, content_score, expires_at, status
-			) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'ready')
-		`, req.ID, req.SourceID, req.Title, req.DurationSeconds, req.StartTime, req.EndTime,
-			req.StorageKey, req.ThumbnailKey, req.Width, req.Height, req.FileSizeBytes,
-			req.Transcript, string(topicsJSON), req.ContentScore, req.ExpiresAt,
-		); err != nil {
-			return fmt.Errorf("insert clip: %w", err)
+		return h.insertClipTx(r.Context(), conn, &req, resolved)
+	}); err != nil {
+		// Topics and embeddings insert with ON CONFLICT, so a unique violation
+		// means the clip itself exists, e.g. from a bulk request whose response was lost
+		errMsg := err.Error()
+		if strings.Contains(errMsg, "UNIQUE constraint") || strings.Contains(errMsg, "duplicate key") {
+			httputil.WriteJSON(w, 409, map[string]interface{}{"error": "clip already exists", "id": req.ID})
+			return
 		}
+		log.Printf("worker create clip failed: %v", err)
+		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to create clip"})
+		return
+	}
+	h.topics.addAll(resolved)
 
-		for _, topicName := range req.Topics {
-			topicID := ResolveOrCreateTopicTx(r.Context(), conn, topicName)
-			if topicID != "" {
-				if _, err := conn.ExecContext(r.Context(),
-					`INSERT INTO clip_topics (clip_id, topic_id, confidence, source) VALUES (?, ?, 1.0, 'keybert') ON CONFLICT DO NOTHING`,
-					req.ID, topicID); err != nil {
-					return fmt.Errorf("insert clip_topics: %w", err)
+	httputil.WriteJSON(w, 201, map[string]interface{}{"id": req.ID})
+}
+
+const maxClipBatch = 128
+
+// HandleCreateClipsBulk creates up to maxClipBatch clips in one request and
+// one transaction. A clip that fails to insert is rolled back on its own and
+// skipped; the response lists the ids that were created, and the caller
+// retries the rest.
+func (h *Handler) HandleCreateClipsBulk(w http.ResponseWriter, r *http.Request) {
+	var req struct {
+		Clips []createClipRequest `json:"clips"`
+	}
+	r.Body = http.MaxBytesReader(w, r.Body, 64<<20)
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		httputil.WriteJSON(w, 400, map[string]string{"error": "invalid request body"})
+		return
+	}
+	if len(req.Clips) > maxClipBatch {
+		httputil.WriteJSON(w, 400, map[string]string{"error": fmt.Sprintf("at most %d clips per request", maxClipBatch)})
+		return
+	}
+
+	ids := make([]string, 0, len(req.Clips))
+	resolved := make(map[string]string)
+	// One transaction for the batch; each clip gets a savepoint so a bad clip
+	// is rolled back and left out of ids instead of failing the whole batch.
+	if err := db.WithTx(r.Context(), h.DB, func(conn *db.CompatConn) error {
+		for i := range req.Clips {
+			clip := &req.Clips[i]
+			var fresh []string
+			for _, name := range clip.Topics {
+				if _, ok := resolved[name]; !ok {
+					fresh = append(fresh, name)
 				}
 			}
-		}
-
-		if _, err := conn.ExecContext(r.Context(),
-			`INSERT INTO clips_fts(clip_id, title, transcript, platform, channel_name) VALUES (?, ?, ?, ?, ?)`,
-			req.ID, req.Title, Truncate(req.Transcript, 2000), req.Platform, req.ChannelName); err != nil {
-			return fmt.Errorf("insert clips_fts: %w", err)
-		}
 
-		if req.TextEmbedding != "" || req.VisualEmbedding != "" {
-			var textEmb, visEmb []byte
-			if req.TextEmbedding != "" {
-				textEmb, _ = base64.StdEncoding.DecodeString(req.TextEmbedding)
+			savepoint := fmt.Sprintf("clip_%d", i)
+			if _, err := conn.ExecContext(r.Context(), "SAVEPOINT "+savepoint); err != nil {
+				return fmt.Errorf("savepoint: %w", err)
 			}
-			if req.VisualEmbedding != "" {
-				visEmb, _ = base64.StdEncoding.DecodeString(req.VisualEmbedding)
+			if err := h.insertClipTx(r.Context(), conn, clip, resolved); err != nil {
+				log.Printf("worker bulk create: skipping clip %s: %v", clip.ID, err)
+				if _, err := conn.ExecContext(r.Context(), "ROLLBACK TO SAVEPOINT "+savepoint); err != nil {
+					return fmt.Errorf("rollback to savepoint: %w", err)
+				}
+				// Topics created for this clip were rolled back with it
+				for _, name := range fresh {
+					delete(resolved, name)
+				}
+			} else {
+				ids = append(ids, clip.ID)
 			}
-			if _, err := conn.ExecContext(r.Context(),
-				`INSERT INTO clip_embeddings (clip_id, text_embedding, visual_embedding, model_version) VALUES (?, ?, ?, ?)
-				 ON CONFLICT(clip_id) DO UPDATE SET text_embedding = EXCLUDED.text_embedding, visual_embedding = EXCLUDED.visual_embedding, model_version = EXCLUDED.model_version`,
-				req.ID, textEmb, visEmb, req.ModelVersion); err != nil {
-				return fmt.Errorf("insert clip_embeddings: %w", err)
+			if _, err := conn.ExecContext(r.Context(), "RELEASE SAVEPOINT "+savepoint); err != nil {
+				return fmt.Errorf("release savepoint: %w", err)
 			}
 		}
-
 		return nil
 	}); err != nil {
-		log.Printf("worker create clip failed: %v", err)
-		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to create clip"})
+		log.Printf("worker bulk create clips failed: %v", err)
+		httputil.WriteJSON(w, 500, map[string]string{"error": "failed to create clips"})
 		return
 	}
+	h.topics.addAll(resolved)
 
-	httputil.WriteJSON(w, 201, map[string]interface{}{"id": req.ID})
+	httputil.WriteJSON(w, 201, map[string]interface{}{"ids": ids})
 }
 
 // ResolveOrCreateTopicTx finds or creates a topic within a transaction.
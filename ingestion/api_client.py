@@ -13,6 +13,12 @@ import time
 import threading
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 log = logging.getLogger("worker.api_client")
 
@@ -22,6 +28,23 @@ class DuplicateSourceError(Exception):
     pass
 
 
+# Keep-alive pool per thread session; connection errors and 502-504s on
+# idempotent requests are retried with backoff (0.5s, 1s, 2s).
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 8
+_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False)
+
+# Clips per bulk create request (the API accepts at most 128)
+_CLIP_BATCH = 64
+
+
+def _json_kwargs(data) -> dict:
+    """Request kwargs carrying data as the JSON body, encoded with orjson when available."""
+    if data is None or orjson is None:
+        return {"json": data}
+    return {"data": orjson.dumps(data)}
+
+
 class WorkerAPIClient:
     """HTTP client for the ClipFeed internal worker API."""
 
@@ -35,6 +58,9 @@ class WorkerAPIClient:
         """Return a per-thread Session, creating and configuring it on first use."""
         if not hasattr(self._local, "session"):
             s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=_RETRY)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
             s.headers.update({
                 "Authorization": f"Bearer {self._worker_secret}",
                 "Content-Type": "application/json",
@@ -49,10 +75,10 @@ class WorkerAPIClient:
         return self._session().get(self._url(path), timeout=self.timeout, **kwargs)
 
     def _post(self, path: str, data=None, **kwargs) -> requests.Response:
-        return self._session().post(self._url(path), json=data, timeout=self.timeout, **kwargs)
+        return self._session().post(self._url(path), timeout=self.timeout, **_json_kwargs(data), **kwargs)
 
     def _put(self, path: str, data=None, **kwargs) -> requests.Response:
-        return self._session().put(self._url(path), json=data, timeout=self.timeout, **kwargs)
+        return self._session().put(self._url(path), timeout=self.timeout, **_json_kwargs(data), **kwargs)
 
     # --- Job operations ---
 
@@ -75,8 +101,12 @@ class WorkerAPIClient:
         error: str = None,
         result: dict = None,
         run_after: str = None,
+        retry_after: int = None,
+        source_status: str = None,
     ):
-        """Update a job's status."""
+        """Update a job's status. When re-queueing, retry_after (seconds) lets the
+        API compute run_after itself; run_after is an explicit timestamp.
+        source_status also sets the job's source status in the same transaction."""
         body = {"status": status}
         if error is not None:
             body["error"] = error
@@ -84,6 +114,10 @@ class WorkerAPIClient:
             body["result"] = result
         if run_after is not None:
             body["run_after"] = run_after
+        if retry_after is not None:
+            body["retry_after_seconds"] = retry_after
+        if source_status is not None:
+            body["source_status"] = source_status
         resp = self._put(f"/jobs/{job_id}", data=body)
         resp.raise_for_status()
 
@@ -102,6 +136,19 @@ class WorkerAPIClient:
         except Exception:
             return False
 
+    def heartbeat_jobs(self, job_ids: list[str]) -> set[str]:
+        """Heartbeat several running jobs in one request.
+        Returns the IDs that are still running; empty on failure."""
+        if not job_ids:
+            return set()
+        try:
+            resp = self._post("/jobs/heartbeat", data={"job_ids": list(job_ids)})
+            resp.raise_for_status()
+            return set(resp.json().get("running") or [])
+        except Exception as e:
+            log.warning("Bulk heartbeat failed: %s", e)
+            return set()
+
     def reclaim_stale_jobs(self, stale_minutes: int = 120) -> tuple[int, int]:
         """Reclaim stale running jobs. Returns (requeued, failed)."""
         resp = self._post("/jobs/reclaim", data={"stale_minutes": stale_minutes})
@@ -126,8 +173,8 @@ class WorkerAPIClient:
 
     # --- Clip operations ---
 
-    def create_clip(
-        self,
+    @staticmethod
+    def _clip_body(
         clip_id: str,
         source_id: str,
         title: str,
@@ -148,8 +195,7 @@ class WorkerAPIClient:
         text_embedding: bytes = None,
         visual_embedding: bytes = None,
         model_version: str = "",
-    ) -> str:
-        """Create a clip with topics, embeddings, and FTS index."""
+    ) -> dict:
         body = {
             "id": clip_id,
             "source_id": source_id,
@@ -174,11 +220,64 @@ class WorkerAPIClient:
             body["text_embedding"] = base64.b64encode(text_embedding).decode()
         if visual_embedding:
             body["visual_embedding"] = base64.b64encode(visual_embedding).decode()
+        return body
 
+    def create_clip(
+        self,
+        clip_id: str,
+        source_id: str,
+        title: str,
+        duration_seconds: float,
+        start_time: float,
+        end_time: float,
+        storage_key: str,
+        thumbnail_key: str,
+        width: int,
+        height: int,
+        file_size_bytes: int,
+        transcript: str,
+        topics: list[str],
+        content_score: float,
+        expires_at: str,
+        platform: str = "",
+        channel_name: str = "",
+        text_embedding: bytes = None,
+        visual_embedding: bytes = None,
+        model_version: str = "",
+    ) -> str:
+        """Create a clip with topics, embeddings, and FTS index. A clip that
+        already exists (409, e.g. a bulk request whose response was lost)
+        counts as created."""
+        body = self._clip_body(
+            clip_id, source_id, title, duration_seconds, start_time, end_time,
+            storage_key, thumbnail_key, width, height, file_size_bytes,
+            transcript, topics, content_score, expires_at,
+            platform=platform, channel_name=channel_name,
+            text_embedding=text_embedding, visual_embedding=visual_embedding,
+            model_version=model_version,
+        )
         resp = self._post("/clips", data=body)
+        if resp.status_code == 409:
+            log.info("Clip %s already exists", clip_id)
+            return clip_id
         resp.raise_for_status()
         return resp.json().get("id", clip_id)
 
+    def create_clips(self, clips: list[dict]) -> list[str]:
+        """Create several clips, each given as create_clip keyword arguments, in
+        bulk requests. The API skips clips it cannot insert and creates the rest;
+        a failed request is logged and skipped. Returns the IDs of the clips created."""
+        ids = []
+        for i in range(0, len(clips), _CLIP_BATCH):
+            batch = [self._clip_body(**clip) for clip in clips[i:i + _CLIP_BATCH]]
+            try:
+                resp = self._post("/clips/bulk", data={"clips": batch})
+                resp.raise_for_status()
+                ids.extend(resp.json().get("ids") or [])
+            except Exception as e:
+                log.warning("Bulk clip creation failed for %d clips: %s", len(batch), e)
+        return ids
+
     # --- Topic operations ---
 
     def resolve_topic(self, name: str) -> str:
@@ -44,11 +44,17 @@ def _ai_enabled() -> bool:
         return True
     return bool(LLM_API_KEY)
 
+# Keep-alive session for direct HTTP calls (availability checks, model pulls)
+_session = requests.Session()
+
 # Timeouts
 AVAILABILITY_TIMEOUT = 3
-GENERATE_TIMEOUT = 30
+GENERATE_TIMEOUT = 30  # per call; batched calls get this much per clip
 PULL_TIMEOUT = int(os.getenv("LLM_PULL_TIMEOUT", "900"))
 
+# Clips titled/tagged per LLM call by generate_titles_and_topics
+SEGMENT_BATCH_SIZE = max(1, int(os.getenv("LLM_SEGMENT_BATCH_SIZE", "8")))
+
 # Log configuration at import time
 logger.info(
     "[LLM] Config loaded: ai_enabled=%s provider=%s model=%s base_url=%s",
@@ -96,6 +102,23 @@ def _strip_code_fences(text: str) -> str:
     return text.strip()
 
 
+def _parse_json_array(text: str):
+    """Parse a JSON array from an LLM response, tolerating code fences and
+    surrounding prose. Returns None if no array can be read."""
+    cleaned = _strip_code_fences(text)
+    try:
+        parsed = json.loads(cleaned)
+    except json.JSONDecodeError:
+        match = re.search(r"\[[\s\S]*\]", cleaned)
+        if not match:
+            return None
+        try:
+            parsed = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+    return parsed if isinstance(parsed, list) else None
+
+
 def _extract_text_content(content) -> str:
     if isinstance(content, str):
         return content.strip()
@@ -214,7 +237,7 @@ def is_available() -> bool:
         if provider == "ollama":
             url = f"{base}/api/tags"
             logger.debug("[LLM] GET %s (timeout=%ds)", url, AVAILABILITY_TIMEOUT)
-            r = requests.get(url, timeout=AVAILABILITY_TIMEOUT)
+            r = _session.get(url, timeout=AVAILABILITY_TIMEOUT)
         elif provider == "anthropic":
             headers = _anthropic_headers()
             if not headers.get("x-api-key"):
@@ -222,14 +245,14 @@ def is_available() -> bool:
                 return False
             url = f"{base}/models"
             logger.debug("[LLM] GET %s (timeout=%ds)", url, AVAILABILITY_TIMEOUT)
-            r = requests.get(url, headers=headers, timeout=AVAILABILITY_TIMEOUT)
+            r = _session.get(url, headers=headers, timeout=AVAILABILITY_TIMEOUT)
         else:
             if not LLM_API_KEY:
                 logger.warning("[LLM] API key missing for provider=%s -- cannot check availability", provider)
                 return False
             url = f"{base}/models"
             logger.debug("[LLM] GET %s (timeout=%ds)", url, AVAILABILITY_TIMEOUT)
-            r = requests.get(
+            r = _session.get(
                 url,
                 headers={
                     "Content-Type": "application/json",
@@ -258,7 +281,7 @@ def model_exists(model: str | None = None) -> bool:
         return True
 
     try:
-        r = requests.get(
+        r = _session.get(
             f"{_base_url()}/api/tags",
             timeout=AVAILABILITY_TIMEOUT,
         )
@@ -309,7 +332,7 @@ def ensure_model(model: str | None = None, auto_pull: bool = True) -> bool:
     try:
         pull_url = f"{_base_url()}/api/pull"
         logger.info("[LLM] POST %s body={name: %s}", pull_url, model)
-        r = requests.post(
+        r = _session.post(
             pull_url,
             json={"name": model, "stream": False},
             timeout=PULL_TIMEOUT,
@@ -370,6 +393,7 @@ def generate(
     prompt: str,
     model: str | None = None,
     max_tokens: int = 256,
+    timeout: float = GENERATE_TIMEOUT,
 ) -> str:
     """Generate text using configured provider. Returns empty string on failure."""
     model = _model(model)
@@ -391,7 +415,7 @@ def generate(
 
         response = completion(
             messages=[{"role": "user", "content": prompt}],
-            timeout=GENERATE_TIMEOUT,
+            timeout=timeout,
             **params,
         )
         elapsed = time.time() - start
@@ -495,31 +519,80 @@ def refine_topics(transcript: str, keybert_topics: list, video_metadata: dict |
         logger.warning("[LLM] Topic refinement returned empty -- keeping original topics: %s", keybert_topics)
         return list(keybert_topics)
 
-    cleaned = _strip_code_fences(result)
-    try:
-        parsed = json.loads(cleaned)
-        if isinstance(parsed, list):
-            refined = [str(item.get("topic", item)) for item in parsed if item]
-            logger.info("[LLM] Topics refined: %s -> %s", keybert_topics, refined)
-            return refined
-    except json.JSONDecodeError:
-        # Try to extract JSON array from mixed response (greedy to handle nested brackets)
-        match = re.search(r"\[[\s\S]*\]", cleaned)
-        if match:
-            try:
-                parsed = json.loads(match.group(0))
-                if isinstance(parsed, list):
-                    refined = [str(item.get("topic", item)) for item in parsed if item]
-                    logger.info("[LLM] Topics refined (extracted from text): %s -> %s", keybert_topics, refined)
-                    return refined
-            except json.JSONDecodeError:
-                pass
-        logger.warning("[LLM] Topic refinement: could not parse JSON from response: %r", result[:200])
+    parsed = _parse_json_array(result)
+    if parsed is not None:
+        refined = [str(item.get("topic", item)) if isinstance(item, dict) else str(item) for item in parsed if item]
+        logger.info("[LLM] Topics refined: %s -> %s", keybert_topics, refined)
+        return refined
+    logger.warning("[LLM] Topic refinement: could not parse JSON from response: %r", result[:200])
 
     logger.info("[LLM] Keeping original topics (parse failed): %s", keybert_topics)
     return list(keybert_topics)
 
 
+def generate_titles_and_topics(
+    segments: list,
+    source_title: str = "",
+    video_metadata: dict | None = None,
+) -> list:
+    """
+    Title and refine topics for several clips of one video, one LLM call per
+    SEGMENT_BATCH_SIZE clips instead of a generate_title and refine_topics call
+    per clip. Each segment is a dict with 'transcript' and 'keybert_topics'.
+    Returns one dict per segment with 'title' and/or 'topics' keys; segments the
+    LLM did not answer get an empty dict.
+    """
+    results = [{} for _ in segments]
+    meta_context = _build_metadata_context(video_metadata)
+    for offset in range(0, len(segments), SEGMENT_BATCH_SIZE):
+        batch = segments[offset:offset + SEGMENT_BATCH_SIZE]
+        logger.info("[LLM] Titling and tagging clips %d-%d of %d",
+                    offset + 1, offset + len(batch), len(segments))
+        prompt = (
+            "Below are clips cut from the same video. For each clip, write a concise, "
+            "engaging title (5-10 words), and confirm or refine its topics with a parent "
+            "category for each. Respond with only a JSON array holding one object per clip: "
+            '{"clip": <clip number>, "title": "...", "topics": [{"topic": "...", "parent": "..."}]}\n\n'
+            f"Source title: {source_title}\n"
+        )
+        if meta_context:
+            prompt += f"{meta_context}\n"
+        for n, seg in enumerate(batch, start=1):
+            topics_str = ", ".join(str(t) for t in seg.get("keybert_topics") or [])
+            excerpt = (seg.get("transcript") or "")[:500]
+            prompt += f"\nClip {n}\nTopics: {topics_str}\nTranscript: {excerpt}\n"
+
+        # The output grows with the batch, so the timeout does too; a timed-out
+        # batch would otherwise fall back to two calls per clip
+        result = generate(prompt, max_tokens=64 + 160 * len(batch), timeout=GENERATE_TIMEOUT * len(batch))
+        parsed = _parse_json_array(result) if result else None
+        if parsed is None:
+            logger.warning("[LLM] Batch titling: could not parse JSON from response: %r", result[:200])
+            continue
+        for item in parsed:
+            if not isinstance(item, dict):
+                continue
+            try:
+                n = int(item.get("clip"))
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= n <= len(batch):
+                continue
+            entry = {}
+            title = str(item.get("title") or "").strip().strip('"')
+            if title:
+                entry["title"] = title
+            topics = item.get("topics")
+            if isinstance(topics, list):
+                refined = [str(t.get("topic", "")) if isinstance(t, dict) else str(t) for t in topics if t]
+                refined = [t for t in refined if t]
+                if refined:
+                    entry["topics"] = refined
+            results[offset + n - 1] = entry
+    logger.info("[LLM] Batch titling answered %d/%d clips", sum(1 for r in results if r), len(segments))
+    return results
+
+
 def evaluate_candidate(
     title: str,
     channel: str,
@@ -662,29 +735,11 @@ def generate_search_queries(
         logger.warning("[LLM] Search query generation returned empty for %r -- using fallbacks", identifier)
         return fallbacks[:count]
 
-    cleaned = _strip_code_fences(result)
-    try:
-        parsed = json.loads(cleaned)
-        if isinstance(parsed, list) and all(isinstance(q, str) for q in parsed):
-            queries = [q.strip() for q in parsed if q.strip()]
-            if queries:
-                logger.info("[LLM] Generated %d search queries for %r: %s",
-                            len(queries), identifier, queries)
-                return queries[:count]
-    except json.JSONDecodeError:
-        # Try extracting JSON array from mixed response
-        match = re.search(r"\[[\s\S]*\]", cleaned)
-        if match:
-            try:
-                parsed = json.loads(match.group(0))
-                if isinstance(parsed, list):
-                    queries = [str(q).strip() for q in parsed if q]
-                    if queries:
-                        logger.info("[LLM] Generated %d search queries (extracted) for %r: %s",
-                                    len(queries), identifier, queries)
-                        return queries[:count]
-            except json.JSONDecodeError:
-                pass
+    parsed = _parse_json_array(result)
+    queries = [q.strip() for q in parsed or [] if isinstance(q, str) and q.strip()]
+    if queries:
+        logger.info("[LLM] Generated %d search queries for %r: %s", len(queries), identifier, queries)
+        return queries[:count]
 
     logger.warning("[LLM] Could not parse search queries from response: %r -- using fallbacks", result[:200])
     return fallbacks[:count]
@@ -25,11 +25,38 @@ INTERVAL = int(os.getenv("SCORE_UPDATE_INTERVAL", "900"))
 CO_OCCURRENCE_MIN_CLIPS = 3
 
 
+# Compact encodings the worker writes (see BlobToFloat32 in api/feed/embeddings.go)
+_INT8_BLOB_HEADER = b"Q8\xc0\x7f"
+_BF16_BLOB_HEADER = b"BF\xc0\x7f"
+
+
+def decode_embedding(blob) -> np.ndarray | None:
+    """Decode an embedding BLOB (raw float32, or the worker's int8/bfloat16
+    encodings) to a float32 vector. Returns None for empty or malformed blobs."""
+    if not blob:
+        return None
+    header = bytes(blob[:4])
+    if header == _INT8_BLOB_HEADER:
+        if len(blob) <= 8:
+            return None
+        scale = np.frombuffer(blob, dtype="<f4", count=1, offset=4)[0]
+        return np.frombuffer(blob, dtype=np.int8, offset=8).astype(np.float32) * scale
+    if header == _BF16_BLOB_HEADER:
+        if len(blob) == 4 or len(blob) % 2:
+            return None
+        return (np.frombuffer(blob, dtype="<u2", offset=4).astype(np.uint32) << 16).view(np.float32)
+    if len(blob) % 4:
+        return None
+    return np.frombuffer(blob, dtype="<f4").astype(np.float32)
+
+
 def open_db():
-    db = sqlite3.connect(DB_PATH, isolation_level=None)
+    db = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=256)
     db.execute("PRAGMA journal_mode=WAL")
     db.execute("PRAGMA busy_timeout=5000")
     db.execute("PRAGMA foreign_keys=ON")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA mmap_size=268435456")
     db.row_factory = sqlite3.Row
     return db
 
@@ -99,8 +126,7 @@ def generate_co_occurrence_edges(db):
     for r in db.execute("SELECT topic_id, COUNT(*) AS cnt FROM clip_topics GROUP BY topic_id").fetchall():
         topic_clip_counts[r["topic_id"]] = r["cnt"]
 
-    edge_count = 0
-    db.execute("BEGIN IMMEDIATE")
+    edges = []
     for r in rows:
         t1, t2, co_count = r["t1"], r["t2"], r["co_count"]
         p_t1 = topic_clip_counts.get(t1, 1) / total_clips
@@ -111,20 +137,18 @@ def generate_co_occurrence_edges(db):
             weight = max(0.1, min(1.0, (pmi + 2) / 4))
         else:
             weight = 0.5
+        edges.append((t1, t2, weight))
+        edges.append((t2, t1, weight))
+    edge_count = len(rows)
 
-        db.execute("""
-            INSERT INTO topic_edges (source_id, target_id, relation, weight)
-            VALUES (?, ?, 'co_occurs', ?)
-            ON CONFLICT(source_id, target_id) DO UPDATE
-            SET weight = excluded.weight
-        """, (t1, t2, weight))
-        db.execute("""
-            INSERT INTO topic_edges (source_id, target_id, relation, weight)
-            VALUES (?, ?, 'co_occurs', ?)
-            ON CONFLICT(source_id, target_id) DO UPDATE
-            SET weight = excluded.weight
-        """, (t2, t1, weight))
-        edge_count += 1
+    # One prepared upsert for every edge, in both directions
+    db.execute("BEGIN IMMEDIATE")
+    db.executemany("""
+        INSERT INTO topic_edges (source_id, target_id, relation, weight)
+        VALUES (?, ?, 'co_occurs', ?)
+        ON CONFLICT(source_id, target_id) DO UPDATE
+        SET weight = excluded.weight
+    """, edges)
     db.execute("COMMIT")
     log.info(f"Generated {edge_count} co-occurrence edges")
 
@@ -132,7 +156,7 @@ def generate_co_occurrence_edges(db):
 def update_user_embeddings(db):
     """
     Maintain a running average text embedding per user from their positively-interacted clips.
-    Reads clip text_embedding BLOBs and averages them (float32 vectors).
+    Decodes clip text_embedding BLOBs and averages them; the result is stored as raw float32.
     """
     users = db.execute("""
         SELECT DISTINCT i.user_id
@@ -157,9 +181,8 @@ def update_user_embeddings(db):
 
         vecs = []
         for er in emb_rows:
-            blob = er["text_embedding"]
-            if blob and len(blob) > 0 and len(blob) % 4 == 0:
-                arr = np.frombuffer(blob, dtype=np.float32).copy()
+            arr = decode_embedding(er["text_embedding"])
+            if arr is not None:
                 vecs.append(arr)
 
         if not vecs:
@@ -5,6 +5,8 @@ using an in-memory SQLite database.
 """
 
 import sqlite3
+import struct
+import types
 import unittest
 
 
@@ -249,5 +251,62 @@ class TestScoreUpdater(unittest.TestCase):
         self.assertGreater(good_score, bad_score)
 
 
+class TestDecodeEmbedding(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import numpy
+            import score_updater
+        except ImportError:
+            self.skipTest("numpy not installed")
+        if not isinstance(numpy, types.ModuleType):  # stubbed by test_worker
+            self.skipTest("numpy not installed")
+        self.decode = score_updater.decode_embedding
+
+    def test_raw_float32(self):
+        self.assertEqual(self.decode(struct.pack("<2f", 1.0, -0.5)).tolist(), [1.0, -0.5])
+
+    def test_int8_scaled(self):
+        blob = b"Q8\xc0\x7f" + struct.pack("<f", 0.5) + bytes([2, 0xfc, 0x7f])
+        self.assertEqual(self.decode(blob).tolist(), [1.0, -2.0, 63.5])
+
+    def test_bfloat16(self):
+        self.assertEqual(self.decode(b"BF\xc0\x7f\x80\x3f\x00\xc0").tolist(), [1.0, -2.0])
+
+    def test_malformed_blobs_rejected(self):
+        for blob in (None, b"", b"\x01\x02\x03", b"Q8\xc0\x7f" + struct.pack("<f", 0.5), b"BF\xc0\x7f\x80"):
+            self.assertIsNone(self.decode(blob), blob)
+
+
+class TestCoOccurrenceEdges(unittest.TestCase):
+
+    def test_edges_written_in_both_directions(self):
+        """Topic pairs seen on enough clips get a symmetric co_occurs edge."""
+        try:
+            import score_updater
+        except ImportError:
+            self.skipTest("numpy not installed")
+        db = make_db()
+        db.row_factory = sqlite3.Row
+        db.executescript("""
+            CREATE TABLE clip_topics (clip_id TEXT, topic_id TEXT, PRIMARY KEY (clip_id, topic_id));
+            CREATE TABLE topic_edges (
+                source_id TEXT, target_id TEXT, relation TEXT, weight REAL,
+                PRIMARY KEY (source_id, target_id)
+            );
+        """)
+        for i in range(score_updater.CO_OCCURRENCE_MIN_CLIPS):
+            seed_clip(db, f"c{i}")
+            db.executemany("INSERT INTO clip_topics VALUES (?, ?)", [(f"c{i}", "cooking"), (f"c{i}", "knives")])
+        seed_clip(db, "lone")
+        db.executemany("INSERT INTO clip_topics VALUES (?, ?)", [("lone", "cooking"), ("lone", "travel")])
+
+        score_updater.generate_co_occurrence_edges(db)
+        edges = db.execute("SELECT source_id, target_id, relation, weight FROM topic_edges ORDER BY 1").fetchall()
+        self.assertEqual([tuple(e)[:3] for e in edges],
+                         [("cooking", "knives", "co_occurs"), ("knives", "cooking", "co_occurs")])
+        self.assertEqual(edges[0]["weight"], edges[1]["weight"])
+
+
 if __name__ == "__main__":
     unittest.main()
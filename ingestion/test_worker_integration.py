@@ -6,8 +6,12 @@ logic end-to-end with a mocked WorkerAPIClient.
 
 import json
 import os
+import re
+import shutil
+import subprocess
 import sys
 import tempfile
+import time
 import unittest
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -122,6 +126,12 @@ class TestSlugify(unittest.TestCase):
     def test_numbers_preserved(self):
         self.assertEqual(worker.Worker._slugify("Web3 Development"), "web3-development")
 
+    def test_unicode_whitespace_separates_words(self):
+        self.assertEqual(worker.Worker._slugify("deep\u00a0learning\tnotes"), "deep-learning-notes")
+
+    def test_non_ascii_digits_removed(self):
+        self.assertEqual(worker.Worker._slugify("level \u0663 boss"), "level-boss")
+
 
 # ---------------------------------------------------------------------------
 # Clip title generation tests
@@ -196,7 +206,7 @@ class TestProcessJobRetry(unittest.TestCase):
         self.assertEqual(call_args[0][1], "rejected")
         self.assertIn("Too short", call_args[1]["error"])
 
-        w.api.update_source.assert_any_call("s1", status="rejected")
+        self.assertEqual(call_args[1]["source_status"], "rejected")
 
     def test_max_attempts_exhausted(self):
         """At max attempts, a transient error should permanently fail the job."""
@@ -215,7 +225,95 @@ class TestProcessJobRetry(unittest.TestCase):
         call_args = w.api.update_job.call_args
         self.assertEqual(call_args[0][1], "failed")
 
-        w.api.update_source.assert_any_call("s1", status="failed")
+        self.assertEqual(call_args[1]["source_status"], "failed")
+
+
+class TestProcessJobPipeline(unittest.TestCase):
+    """Happy-path process_job with every media stage stubbed out."""
+
+    def _run_job(self, w, n_segments, process_segment, transcripts=None):
+        segments = [{"start": 45.0 * i, "end": 45.0 * (i + 1)} for i in range(n_segments)]
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(worker, "WORK_DIR", Path(tmp)), \
+                patch.object(w, "fetch_source_metadata", return_value={"title": "Src"}), \
+                patch.object(w, "download", return_value=Path(tmp) / "source.mp4"), \
+                patch.object(w, "extract_metadata", return_value={"duration": 45.0 * n_segments}), \
+                patch.object(w, "_decode_audio", return_value=None), \
+                patch.object(w, "detect_scenes", return_value=segments), \
+                patch.object(w, "_transcode_segments", return_value=([Path(f"clip_{i}.mp4") for i in range(n_segments)], (720, 1280))), \
+                patch.object(w, "_transcribe_segments", return_value=transcripts or [""] * n_segments), \
+                patch.object(w, "_extract_topics", return_value=[[]] * n_segments), \
+                patch.object(w, "_generate_visual_embeddings", return_value=[None] * n_segments), \
+                patch.object(w, "process_segment", side_effect=process_segment), \
+                patch.object(w, "_finalize_clips", return_value=["c"]) as finalize:
+            w.process_job("j1", {"source_id": "s1", "url": "http://example.com/v", "platform": ""})
+        return finalize
+
+    def test_segment_records_kept_in_order_and_failures_dropped(self):
+        w = _make_worker()
+
+        def process_segment(clip_path, source_id, seg, index, *args):
+            time.sleep((5 - index) * 0.01)  # later segments finish first
+            return None if index == 2 else {"index": index}
+
+        finalize = self._run_job(w, 5, process_segment)
+        records = finalize.call_args[0][0]
+        self.assertEqual([r["index"] for r in records], [0, 1, 3, 4])
+        w.api.update_job.assert_called_once_with("j1", "complete", result={"clip_ids": ["c"], "clip_count": 1},
+                                                  source_status="complete")
+
+    def test_silent_segments_skipped_when_enabled(self):
+        w = _make_worker()
+        processed = []
+
+        def process_segment(clip_path, source_id, seg, index, *args):
+            processed.append(index)
+            return {"index": index}
+
+        with patch.object(worker, "SKIP_EMPTY_TRANSCRIPT_CLIPS", True), \
+                patch.object(w, "_label_segments_llm", side_effect=lambda t, k, m: [{} for _ in t]) as label:
+            finalize = self._run_job(w, 3, process_segment, transcripts=["hello there", " ", "bye now"])
+        self.assertEqual(sorted(processed), [0, 2])
+        self.assertEqual(label.call_args[0][0], ["hello there", "bye now"])
+        self.assertEqual([r["index"] for r in finalize.call_args[0][0]], [0, 2])
+
+
+class TestCopySegmentsFfmpeg(unittest.TestCase):
+    """Copy-mode cuts against real ffmpeg, on a source with sparse keyframes."""
+
+    def setUp(self):
+        if shutil.which("ffmpeg") is None:
+            self.skipTest("ffmpeg not installed")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.work = Path(self.tmp.name)
+        self.source = self.work / "source.mp4"
+        # 40s with a keyframe every 10s
+        subprocess.run([
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", "testsrc=size=160x120:rate=25",
+            "-f", "lavfi", "-i", "sine=frequency=440",
+            "-t", "40", "-c:v", "mpeg4", "-g", "250", "-c:a", "aac", "-shortest", str(self.source),
+        ], check=True)
+
+    def _duration(self, path):
+        stderr = subprocess.run(["ffmpeg", "-i", str(path)], capture_output=True, text=True).stderr
+        h, m, sec = re.search(r"Duration: (\d+):(\d+):([\d.]+)", stderr).groups()
+        return int(h) * 3600 + int(m) * 60 + float(sec)
+
+    def test_segments_sharing_a_gop_keep_their_own_clips(self):
+        w = _make_worker()
+        # 4s and 8s fall in the same GOP; a single segment-muxer pass would
+        # cut both at 10s and shift every later clip by one
+        segments = [{"start": 0.0, "end": 4.0}, {"start": 4.0, "end": 8.0},
+                    {"start": 8.0, "end": 30.0}, {"start": 30.0, "end": 40.0}]
+        with patch.object(worker, "PROCESSING_MODE", "copy"):
+            paths, size = w._transcode_segments(self.source, segments, self.work)
+
+        self.assertEqual(size, (160, 120))
+        # Each clip runs from the keyframe at or before its segment's start to the segment's end
+        for path, want in zip(paths, [4.0, 8.0, 30.0, 10.0]):
+            self.assertAlmostEqual(self._duration(path), want, delta=0.1)
 
 
 # ---------------------------------------------------------------------------
@@ -273,6 +371,53 @@ class TestDecryptCookieIntegration(unittest.TestCase):
         result = worker.decrypt_cookie(encoded, "wrong-key")
         self.assertIsNone(result)
 
+    def test_cipher_built_once_per_secret(self):
+        import base64
+        cipher_cls = MagicMock()
+        cipher_cls.return_value.decrypt.return_value = b"cookie"
+        worker._cookie_cipher.cache_clear()
+        self.addCleanup(worker._cookie_cipher.cache_clear)
+        encoded = base64.b64encode(b"\0" * 12 + b"ciphertext").decode()
+        with patch.object(worker, "AESGCM", cipher_cls):
+            self.assertEqual(worker.decrypt_cookie(encoded, "secret"), "cookie")
+            self.assertEqual(worker.decrypt_cookie(encoded, "secret"), "cookie")
+        cipher_cls.assert_called_once()
+
+
+class TestCookieReuse(unittest.TestCase):
+    """Cookies are fetched once per source and written to a single file."""
+
+    def setUp(self):
+        worker._cookie_cache.clear()
+        self.addCleanup(worker._cookie_cache.clear)
+
+    def test_repeat_lookup_served_from_cache(self):
+        w = _make_worker()
+        w.api.get_cookie.return_value = "cookie-data"
+        self.assertEqual(w._get_cookie("s1", "youtube"), "cookie-data")
+        self.assertEqual(w._get_cookie("s1", "youtube"), "cookie-data")
+        w.api.get_cookie.assert_called_once_with("s1", "youtube")
+
+    def test_expired_entry_refetched(self):
+        w = _make_worker()
+        w.api.get_cookie.return_value = "fresh"
+        worker._cookie_cache[("s1", "youtube")] = ("old", 0.0)
+        with patch("worker.time.monotonic", return_value=worker.COOKIE_CACHE_SECONDS + 1.0):
+            self.assertEqual(w._get_cookie("s1", "youtube"), "fresh")
+
+    def test_one_cookie_file_shared_by_both_ytdlp_calls(self):
+        w = _make_worker()
+        w.api.get_cookie.return_value = "cookie-data"
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(worker, "WORK_DIR", Path(tmp)), \
+                patch.object(w, "fetch_source_metadata", return_value={}) as fetch, \
+                patch.object(w, "download", side_effect=worker.VideoRejected("stop")) as download:
+            w.process_job("j1", {"source_id": "s1", "url": "http://youtube.com/watch?v=abc",
+                                 "platform": "youtube"})
+        cookie_path = fetch.call_args.kwargs["cookie_path"]
+        self.assertEqual(cookie_path.name, "cookies.txt")
+        self.assertEqual(download.call_args.kwargs["cookie_path"], cookie_path)
+
 
 # ---------------------------------------------------------------------------
 # Heartbeat tests
@@ -295,5 +440,90 @@ class TestHeartbeat(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestBulkHeartbeat(unittest.TestCase):
+    """heartbeat_jobs sends one request for all in-flight jobs."""
+
+    def setUp(self):
+        try:
+            from api_client import WorkerAPIClient
+        except ImportError:
+            self.skipTest("requests not installed")
+        self.client = WorkerAPIClient("http://api:8080", "secret")
+        self.client._post = MagicMock()
+
+    def test_single_request_returns_running_ids(self):
+        self.client._post.return_value = MagicMock(status_code=200, json=lambda: {"running": ["a"]})
+        running = self.client.heartbeat_jobs(["a", "b"])
+        self.assertEqual(running, {"a"})
+        self.client._post.assert_called_once_with("/jobs/heartbeat", data={"job_ids": ["a", "b"]})
+
+    def test_no_jobs_skips_request(self):
+        self.assertEqual(self.client.heartbeat_jobs([]), set())
+        self.client._post.assert_not_called()
+
+    def test_failure_returns_empty_set(self):
+        self.client._post.side_effect = ConnectionError("api down")
+        self.assertEqual(self.client.heartbeat_jobs(["a"]), set())
+
+    def test_session_mounts_pooled_retrying_adapter(self):
+        session = self.client._session()
+        adapter = session.get_adapter("http://api:8080/api/internal/jobs/claim")
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIs(session, self.client._session())
+
+
+
+class TestCreateClip(unittest.TestCase):
+    """create_clip treats a clip that already exists as created."""
+
+    def setUp(self):
+        try:
+            from api_client import WorkerAPIClient
+        except ImportError:
+            self.skipTest("requests not installed")
+        self.client = WorkerAPIClient("http://api:8080", "secret")
+        self.client._post = MagicMock()
+        self.fields = dict(
+            clip_id="c1", source_id="s1", title="t", duration_seconds=30.0, start_time=0.0,
+            end_time=30.0, storage_key="k", thumbnail_key="tk", width=720, height=1280,
+            file_size_bytes=1, transcript="", topics=[], content_score=0.5, expires_at="x",
+        )
+
+    def test_existing_clip_counts_as_created(self):
+        resp = MagicMock(status_code=409)
+        self.client._post.return_value = resp
+        self.assertEqual(self.client.create_clip(**self.fields), "c1")
+        resp.raise_for_status.assert_not_called()
+
+    def test_other_errors_raise(self):
+        resp = MagicMock(status_code=500)
+        resp.raise_for_status.side_effect = RuntimeError("500")
+        self.client._post.return_value = resp
+        with self.assertRaises(RuntimeError):
+            self.client.create_clip(**self.fields)
+
+
+class TestSearchQueryParsing(unittest.TestCase):
+    """generate_search_queries only accepts string items from the model."""
+
+    def setUp(self):
+        try:
+            import llm_client
+        except ImportError:
+            self.skipTest("litellm not installed")
+        self.llm = llm_client
+
+    def _queries(self, reply):
+        with patch.object(self.llm, "_ai_enabled", return_value=True), \
+                patch.object(self.llm, "is_available", return_value=True), \
+                patch.object(self.llm, "generate", return_value=reply):
+            return self.llm.generate_search_queries("cats", "channel")
+
+    def test_string_items_are_used(self):
+        self.assertEqual(self._queries('["cats funny", " cats asmr "]'), ["cats funny", "cats asmr"])
+
+    def test_non_string_items_fall_back(self):
+        self.assertEqual(self._queries('[{"query": "x"}]')[0], "cats")
+
 if __name__ == "__main__":
     unittest.main()
@@ -11,27 +11,44 @@ import time
 import uuid
 import signal
 import logging
+import shutil
 import subprocess
+import tempfile
 import hashlib
 import base64
 import ipaddress
+import functools
+from bisect import bisect_left, bisect_right
+from collections import deque
 from pathlib import Path
 from urllib.parse import urlparse
 from datetime import datetime, timedelta
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 try:
     from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 except ImportError:
     AESGCM = None
+try:
+    import av  # PyAV, installed alongside faster-whisper
+except ImportError:
+    av = None
 
 import struct
 
 import numpy as np
 from minio import Minio
 from faster_whisper import WhisperModel
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:  # faster-whisper < 1.1
+    BatchedInferencePipeline = None
 from keybert import KeyBERT
 from sentence_transformers import SentenceTransformer
+try:
+    import llm_client
+except ImportError:  # LiteLLM not installed: titles and topics use the heuristics
+    llm_client = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -47,7 +64,12 @@ MINIO_SSL = os.getenv("MINIO_USE_SSL", "false") == "true"
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
 MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
 FFMPEG_THREADS = os.getenv("FFMPEG_THREADS", "2")
-WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "4"))
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "")
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS") or 0)  # 0 = usable cores split across concurrent jobs
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE") or 0)  # 0 = 32 on GPU, 4 on CPU
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "3"))  # segments tagged/uploaded in parallel per job
+SKIP_EMPTY_TRANSCRIPT_CLIPS = os.getenv("SKIP_EMPTY_TRANSCRIPT_CLIPS", "false") == "true"  # drop segments with no speech
+GPU_JOB_MEMORY_GB = float(os.getenv("GPU_JOB_MEMORY_GB", "4"))  # free VRAM budgeted per concurrent job
 CLIP_TTL_DAYS = int(os.getenv("CLIP_TTL_DAYS", "30"))
 WORK_DIR = Path(os.getenv("WORK_DIR", "/tmp/clipfeed"))
 
@@ -60,17 +82,79 @@ MAX_CLIP_SECONDS = int(os.getenv("MAX_CLIP_SECONDS", "90"))
 TARGET_CLIP_SECONDS = int(os.getenv("TARGET_CLIP_SECONDS", "45"))
 MAX_VIDEO_DURATION = int(os.getenv("MAX_VIDEO_DURATION", "3600"))
 MAX_DOWNLOAD_SIZE_MB = int(os.getenv("MAX_DOWNLOAD_SIZE_MB", "2048"))
+DOWNLOAD_FRAGMENTS = 4  # HLS/DASH fragments yt-dlp fetches in parallel
+SOURCE_INFO_FILE = "source_info.json"  # metadata fetch output, reused by the download
 PROCESSING_MODE = os.getenv("PROCESSING_MODE", "transcode")
+VIDEO_ENCODER = os.getenv("VIDEO_ENCODER", "auto")  # auto, libx264, h264_nvenc, h264_qsv, h264_vaapi, h264_amf
+VAAPI_DEVICE = os.getenv("VAAPI_DEVICE", "/dev/dri/renderD128")
 SILENCE_NOISE_DB = -30
 SILENCE_MIN_DURATION = 0.5
+AUDIO_SAMPLE_RATE = 16000  # mono PCM rate for silence detection (and Whisper's native rate)
+AUDIO_DECODE_TIMEOUT = 300  # seconds
+SILENCE_HOP_SECONDS = 0.01
+# Whisper decoding: VAD splits on the same silences silencedetect looks for,
+# and temperature fallback stops at 0.4 instead of retrying up to 1.0
+WHISPER_VAD_PARAMETERS = {"min_silence_duration_ms": int(SILENCE_MIN_DURATION * 1000)}
+WHISPER_TEMPERATURES = [0.0, 0.2, 0.4]
 
 # Retry parameters
 RETRY_BASE_DELAY = 30  # seconds; doubles each attempt (30s, 60s, 120s, …)
 JOB_STALE_MINUTES = int(os.getenv("JOB_STALE_MINUTES", "15"))
 HEARTBEAT_INTERVAL = 30  # seconds between heartbeat pings for running jobs
+CLIP_BATCH_SIZE = 64  # keyframes per CLIP forward pass
+KEYFRAME_SIZE = 224  # CLIP ViT-B-32 input resolution
+KEYFRAMES_PER_CLIP = 3
+TEXT_EMBED_BATCH_SIZE = 32
+TEXT_EMBED_MAX_CHARS = 2000  # well past MiniLM's 256-token window; the rest would be truncated anyway
+UPLOAD_PART_SIZE = 16 * 1024 * 1024  # clips below this go up in a single PUT
+UPLOAD_PARALLEL_PARTS = 4
+FFMPEG_STDERR_LINES = 64  # stderr tail kept for transcode error messages
+THUMBNAIL_TIMEOUT = 15  # seconds; one seek plus one decoded frame
+
+# Initial content_score prior: sigmoid of (features - baseline) . weights over
+# [transcript words per second, topic count]. A clip at the baseline scores 0.5;
+# interaction-based scoring takes over once a clip has enough views.
+CONTENT_SCORE_WEIGHTS = (0.4, 0.2)
+CONTENT_SCORE_BASELINE = (2.0, 2.5)
 
 shutdown = False
 
+# extract_metadata results keyed by (path, mtime_ns, size); oldest entries evicted first
+PROBE_CACHE_SIZE = 256
+_probe_cache: dict = {}
+_probe_cache_lock = threading.Lock()
+
+# Decrypted platform cookies keyed by (source_id, platform) -> (cookie, fetched_at)
+COOKIE_CACHE_SECONDS = 300
+_cookie_cache: dict = {}
+_cookie_cache_lock = threading.Lock()
+
+
+class _SlugTable(dict):
+    """str.translate table that keeps a-z, 0-9, '-' and whitespace and deletes
+    everything else. Non-ASCII code points are classified on first use."""
+
+    def __missing__(self, codepoint: int):
+        value = codepoint if chr(codepoint).isspace() else None
+        self[codepoint] = value
+        return value
+
+
+_SLUG_TABLE = _SlugTable({
+    c: c if chr(c) in "abcdefghijklmnopqrstuvwxyz0123456789-" or chr(c).isspace() else None
+    for c in range(128)
+})
+_SLUG_DASH_RE = re.compile(r'[\s-]+')
+# Frame size of the first output's video stream in ffmpeg's -v info stream listing
+_OUTPUT_SIZE_RE = re.compile(r"Output #0.*?Stream #0:0\S*: Video: [^\n]*?, (\d+)x(\d+)[ ,\n]", re.S)
+_STREAM_LISTING_RE = re.compile(rb"(Input|Output) #|\s+Stream #")
+
+
+# Docker service names reachable from inside the worker's network
+_BLOCKED_HOSTS = frozenset({"localhost", "minio", "api", "worker", "llm", "scout", "nginx", "proxy", "web"})
+_INTERNAL_SUFFIXES = (".internal", ".local")
+_IPV4_CHARS = frozenset("0123456789.")
+
 
 def validate_url(url: str) -> None:
     """Reject URLs targeting internal/private networks (SSRF protection)."""
@@ -83,19 +167,23 @@ def validate_url(url: str) -> None:
         raise VideoRejected(f"No hostname in URL: {url}")
 
     # Block obvious internal hostnames
-    _blocked = {"localhost", "minio", "api", "worker", "llm", "scout", "nginx", "proxy", "web"}
-    if hostname.lower() in _blocked:
+    if hostname.lower() in _BLOCKED_HOSTS:
         raise VideoRejected(f"Blocked internal hostname: {hostname}")
 
-    # Resolve and block private/reserved IP ranges
-    try:
-        addr = ipaddress.ip_address(hostname)
-        if addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_reserved:
-            raise VideoRejected(f"Blocked private/reserved IP: {hostname}")
-    except ValueError:
-        # Not a bare IP -- check for suspicious patterns
-        if hostname.endswith(".internal") or hostname.endswith(".local"):
-            raise VideoRejected(f"Blocked internal hostname: {hostname}")
+    # Only IP literals need parsing: dotted decimal, or anything with a colon (IPv6)
+    if ":" in hostname or _IPV4_CHARS.issuperset(hostname):
+        try:
+            addr = ipaddress.ip_address(hostname)
+        except ValueError:
+            pass
+        else:
+            if addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_reserved:
+                raise VideoRejected(f"Blocked private/reserved IP: {hostname}")
+            return
+
+    # Not a bare IP -- check for suspicious patterns
+    if hostname.endswith(_INTERNAL_SUFFIXES):
+        raise VideoRejected(f"Blocked internal hostname: {hostname}")
 
 
 class JobCancelled(Exception):
@@ -118,6 +206,12 @@ signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
 
+@functools.lru_cache(maxsize=8)
+def _cookie_cipher(secret: str):
+    """AES-256-GCM cipher for a secret; the key derivation and schedule are done once."""
+    return AESGCM(hashlib.sha256(secret.encode()).digest())
+
+
 def decrypt_cookie(encoded: str, secret: str) -> str | None:
     """Decrypt a cookie encrypted by the Go API (AES-256-GCM, nonce-prepended, base64).
     Returns None on any failure so the job can proceed without cookies."""
@@ -125,36 +219,251 @@ def decrypt_cookie(encoded: str, secret: str) -> str | None:
         log.warning("cryptography package not installed -- cannot decrypt cookies")
         return None
     try:
-        key = hashlib.sha256(secret.encode()).digest()
         data = base64.b64decode(encoded)
         nonce_size = 12  # AES-GCM standard nonce length
         if len(data) < nonce_size:
             return None
         nonce, ciphertext = data[:nonce_size], data[nonce_size:]
-        aesgcm = AESGCM(key)
-        plaintext = aesgcm.decrypt(nonce, ciphertext, None)
+        plaintext = _cookie_cipher(secret).decrypt(nonce, ciphertext, None)
         return plaintext.decode()
     except Exception as e:
         log.warning("Cookie decryption failed: %s", e)
         return None
 
 
+def _write_cookie_file(path: Path, cookie_str: str) -> Path:
+    """Write a Netscape cookie file readable only by the worker user."""
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+        f.write(cookie_str)
+    return path
+
+
+def _run_ffmpeg(cmd: list, timeout: float, keep: re.Pattern | None = None) -> subprocess.CompletedProcess:
+    """Run ffmpeg with stdout discarded and stderr streamed rather than buffered:
+    only the lines matching keep and the last FFMPEG_STDERR_LINES lines are
+    returned, decoded, as stderr. Raises subprocess.TimeoutExpired like
+    subprocess.run if ffmpeg runs past timeout."""
+    tail = deque(maxlen=FFMPEG_STDERR_LINES)
+    kept = []
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    watchdog = threading.Timer(timeout, kill)
+    watchdog.start()
+    try:
+        with proc.stderr:
+            for line in proc.stderr:
+                if keep is not None and keep.match(line):
+                    kept.append(line)
+                else:
+                    tail.append(line)
+        returncode = proc.wait()
+    finally:
+        watchdog.cancel()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    stderr = b"".join([*kept, *tail]).decode("utf-8", "replace")
+    return subprocess.CompletedProcess(cmd, returncode, stderr=stderr)
+
+
+def find_silences(samples, sample_rate: int = AUDIO_SAMPLE_RATE,
+                  noise_db: float = SILENCE_NOISE_DB,
+                  min_duration: float = SILENCE_MIN_DURATION) -> list:
+    """Return (start, end) seconds of every stretch of audio quieter than noise_db
+    for at least min_duration. RMS is evaluated over sliding min_duration windows
+    on a 10 ms hop grid using a cumulative sum, so the scan is a handful of
+    vectorized passes regardless of file length."""
+    hop_len = max(1, int(sample_rate * SILENCE_HOP_SECONDS))
+    n_hops = len(samples) // hop_len
+    win = max(1, int(round(min_duration / SILENCE_HOP_SECONDS)))
+    if n_hops < win:
+        return []
+
+    frames = samples[:n_hops * hop_len].reshape(n_hops, hop_len)
+    hop_energy = np.einsum("ij,ij->i", frames, frames)
+    cs = np.concatenate(([0.0], np.cumsum(hop_energy, dtype=np.float64)))
+    mean_square = (cs[win:] - cs[:-win]) / (win * hop_len)
+    silent = 10 * np.log10(np.maximum(mean_square, 1e-12)) < noise_db
+
+    # A run of silent windows starting at hops [s, e) covers [s, e - 1 + win) hops
+    edges = np.diff(silent.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    bounds = np.stack([starts, ends - 1 + win], axis=1) * (hop_len / sample_rate)
+    return [(start, end) for start, end in bounds.tolist()]
+
+
+# Compact embedding blob encodings, decoded by BlobToFloat32 in api/feed/embeddings.go.
+# The 4-byte headers read as a float32 NaN, so they can't be mistaken for the
+# raw float32 blobs already stored.
+_INT8_BLOB_HEADER = b"Q8\xc0\x7f"  # + <f4 scale + one int8 per dimension
+_BF16_BLOB_HEADER = b"BF\xc0\x7f"  # + one <u2 bfloat16 per dimension
+
+
+def _int8_embedding_blobs(vecs) -> list:
+    """Scalar-quantize each row of a float32 matrix to int8 with its own scale
+    (max |x| / 127). A quarter of the float32 size; cosine similarity is
+    preserved to within ~1e-4 for unit vectors."""
+    scales = np.abs(vecs).max(axis=1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.rint(vecs / scales).astype(np.int8)
+    scales = scales.astype("<f4")
+    return [_INT8_BLOB_HEADER + scale.tobytes() + row.tobytes() for scale, row in zip(scales, q)]
+
+
+def _bf16_embedding_blobs(vecs) -> list:
+    """Round each row of a float32 matrix to bfloat16 (round-to-nearest-even on
+    the top 16 bits). Half the float32 size at ~3 significant digits."""
+    bits = np.ascontiguousarray(vecs, dtype=np.float32).view(np.uint32)
+    halves = ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype("<u2")
+    return [_BF16_BLOB_HEADER + row.tobytes() for row in halves]
+
+
 def _detect_device() -> tuple[str, str]:
-    """Pick CUDA when an NVIDIA GPU is reachable, otherwise fall back to CPU."""
+    """Pick CUDA when an NVIDIA GPU is reachable, otherwise fall back to CPU.
+    On CUDA Whisper defaults to int8 weights with fp16 activations where the GPU
+    supports it, plain fp16 otherwise. WHISPER_COMPUTE_TYPE overrides the
+    default compute type for either device (e.g. float16, int8_float32)."""
     try:
         import ctranslate2
-        if "cuda" in ctranslate2.get_supported_compute_types("cuda"):
+        if ctranslate2.get_cuda_device_count() > 0:
             log.info("CUDA device detected -- Whisper will use GPU")
-            return "cuda", "float16"
+            supported = ctranslate2.get_supported_compute_types("cuda")
+            default = "int8_float16" if "int8_float16" in supported else "float16"
+            return "cuda", WHISPER_COMPUTE_TYPE or default
     except Exception:
         pass
     log.info("No CUDA device found -- Whisper will use CPU")
-    return "cpu", "int8"
+    return "cpu", WHISPER_COMPUTE_TYPE or "int8"
+
+
+def _usable_cores() -> int:
+    """CPU cores this process may run on (respects container cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _whisper_threads() -> int:
+    """CPU threads per Whisper worker: WHISPER_THREADS, or the usable cores split
+    across concurrent jobs so parallel transcriptions (and the ffmpeg processes
+    beside them) don't oversubscribe the CPU."""
+    return WHISPER_THREADS or max(1, _usable_cores() // MAX_CONCURRENT)
+
+
+def _effective_concurrency(device: str) -> int:
+    """Cap concurrent jobs by what the hardware can hold: free VRAM divided by
+    GPU_JOB_MEMORY_GB on CUDA, usable cores per Whisper thread pool on CPU.
+    Never exceeds MAX_CONCURRENT_JOBS and never drops below 1."""
+    if device == "cuda":
+        try:
+            import torch
+            free_bytes, _ = torch.cuda.mem_get_info()
+            fits = int(free_bytes / 1e9 // GPU_JOB_MEMORY_GB)
+        except Exception as e:
+            log.warning("Could not read free GPU memory, using MAX_CONCURRENT_JOBS: %s", e)
+            return MAX_CONCURRENT
+    else:
+        fits = _usable_cores() // _whisper_threads()
+    return max(1, min(MAX_CONCURRENT, fits))
+
+
+# Encoder-specific quality settings, roughly matched to libx264 -crf 23
+_ENCODER_ARGS = {
+    "libx264": ["-preset", "fast", "-crf", "23"],
+    # forced-idr makes the forced keyframes at segment cuts real IDR frames, which
+    # the segment muxer splits on (VAAPI always encodes forced keyframes as IDR)
+    "h264_nvenc": ["-preset", "p4", "-rc", "vbr", "-cq", "23", "-b:v", "0", "-forced-idr", "1"],
+    "h264_qsv": ["-preset", "faster", "-global_quality", "23", "-forced_idr", "1"],
+    "h264_vaapi": ["-qp", "23"],
+    "h264_amf": ["-quality", "speed", "-rc", "cqp", "-qp_i", "23", "-qp_p", "23", "-forced_idr", "1"],
+}
+# Hardware decoder paired with each encoder (frames are copied back for the CPU scale filter)
+_ENCODER_HWACCEL = {
+    "h264_nvenc": "cuda",
+    "h264_qsv": "qsv",
+    "h264_vaapi": "vaapi",
+}
+# Encoders that only take frames in device memory: global options that open the
+# device, and the filter steps that upload the scaled frames to it
+_ENCODER_DEVICE_ARGS = {
+    "h264_vaapi": ("-vaapi_device", VAAPI_DEVICE),
+}
+_ENCODER_UPLOAD_FILTER = {
+    "h264_vaapi": ",format=nv12,hwupload",
+}
+
+# Fixed parts of the segment transcode command, built once rather than per job.
+# Keep aspect ratio, target 720p max; the scaler rounds to the even dimensions
+# H.264 needs, so no pad stage; yuv420p keeps 4:4:4/10-bit sources playable on phones
+_CLIP_SCALE_FILTER = (
+    "scale='min(720,iw)':'min(1280,ih)':force_original_aspect_ratio=decrease"
+    ":force_divisible_by=2,format=yuv420p"
+)
+_CLIP_AUDIO_ARGS = ("-c:a", "aac", "-b:a", "128k")
+_SEGMENT_MUXER_ARGS = (
+    "-avoid_negative_ts", "make_zero",
+    # Interleave strictly: the mostly-idle thumbnail branch would otherwise let
+    # audio run ahead of video and spill past the cut into the earlier piece
+    "-max_interleave_delta", "0",
+    "-f", "segment",
+    "-reset_timestamps", "1",
+    "-segment_format_options", "movflags=+faststart",
+)
+
+
+def _encoder_works(encoder: str) -> bool:
+    """Encode one tiny test frame to confirm ffmpeg can actually open the encoder
+    with the options clips are encoded with."""
+    cmd = [
+        "ffmpeg", "-hide_banner", "-v", "error", *_ENCODER_DEVICE_ARGS.get(encoder, ()),
+        "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+    ]
+    if encoder in _ENCODER_UPLOAD_FILTER:
+        cmd += ["-vf", _ENCODER_UPLOAD_FILTER[encoder].lstrip(",")]
+    cmd += ["-frames:v", "1", "-c:v", encoder, *_ENCODER_ARGS.get(encoder, ()), "-f", "null", "-"]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=30).returncode == 0
+    except Exception:
+        return False
+
+
+def _detect_video_encoder(device: str) -> str:
+    """Pick the H.264 encoder for clip transcodes: the first fixed-function
+    encoder that opens (NVENC when CUDA is present, then Intel QSV, then VAAPI
+    for Intel/AMD on Linux, then AMD AMF), otherwise libx264."""
+    if VIDEO_ENCODER != "auto":
+        return VIDEO_ENCODER
+    candidates = (["h264_nvenc"] if device == "cuda" else []) + ["h264_qsv", "h264_vaapi", "h264_amf"]
+    for encoder in candidates:
+        if _encoder_works(encoder):
+            log.info("Hardware encoder %s available -- clips will be encoded on the GPU", encoder)
+            return encoder
+    return "libx264"
+
+
+def _reduce_precision(model, device: str):
+    """Halve inference memory traffic: fp16 weights on CUDA, int8 dynamically
+    quantized Linear layers on CPU. Returns the original model on failure."""
+    try:
+        import torch
+        if device == "cuda":
+            return model.to(device).half()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    except Exception as e:
+        log.warning("Reduced-precision conversion failed, keeping fp32: %s", e)
+        return model
 
 
 class Worker:
-    # Default so object.__new__(Worker) used by tests gets a sane value
+    # Defaults so object.__new__(Worker) used by tests gets sane values
     api = None
+    video_encoder = "libx264"
+    max_concurrent = MAX_CONCURRENT
 
     def __init__(self):
         from api_client import WorkerAPIClient
@@ -163,8 +472,8 @@ class Worker:
         self.api = WorkerAPIClient(WORKER_API_URL, WORKER_SECRET)
         log.info("Worker connecting to API at %s", WORKER_API_URL)
         self.api.wait_for_api()
-        import llm_client as _llm
-        _llm.set_api_client(self.api)
+        if llm_client is not None:
+            llm_client.set_api_client(self.api)
 
         self.minio = Minio(
             MINIO_ENDPOINT,
@@ -178,23 +487,62 @@ class Worker:
             self.minio.make_bucket(MINIO_BUCKET)
 
         device, compute_type = _detect_device()
-        whisper_kwargs = dict(device=device, compute_type=compute_type)
+        self.video_encoder = _detect_video_encoder(device)
+        whisper_kwargs = dict(device=device, compute_type=compute_type, num_workers=1)
         if device == "cpu":
-            whisper_kwargs["cpu_threads"] = WHISPER_THREADS
+            cpu_threads = _whisper_threads()
+            whisper_kwargs["cpu_threads"] = cpu_threads
+            # Each concurrent job's share of the cores is cpu_threads; one
+            # CTranslate2 worker per job lets those shares transcribe in parallel
+            # instead of queueing on a single worker
+            whisper_kwargs["num_workers"] = _effective_concurrency(device)
+            log.info("Whisper using %d workers x %d CPU threads (%s)",
+                     whisper_kwargs["num_workers"], cpu_threads, compute_type)
+            # torch otherwise uses every core per op, so MiniLM/CLIP passes from
+            # concurrent jobs would oversubscribe the cores split between them
+            import torch
+            torch.set_num_threads(cpu_threads)
         self.whisper = WhisperModel(WHISPER_MODEL, **whisper_kwargs)
-        self.kw_model = KeyBERT(model='all-MiniLM-L6-v2')
-        self.text_embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.batched_whisper = None
+        self.whisper_batch_size = WHISPER_BATCH_SIZE or (32 if device == "cuda" else 4)
+        if BatchedInferencePipeline is not None:
+            self.batched_whisper = BatchedInferencePipeline(model=self.whisper)
+        # One MiniLM instance serves both KeyBERT and clip text embeddings
+        self.text_embedder = _reduce_precision(SentenceTransformer('all-MiniLM-L6-v2', device=device), device)
+        self.kw_model = KeyBERT(model=self.text_embedder)
 
         self._clip_model = None
-        self._clip_preprocess = None
+        self._clip_device = "cpu"
+        self._clip_norm = None  # (mean, std) applied to batched keyframe tensors
         self._clip_tokenizer = None
         self._clip_lock = threading.Lock()
 
+        # Shared by all jobs so segment uploads overlap tagging and probing
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="upload")
+
+        # Sized after the models load so their memory is already accounted for
+        self.max_concurrent = _effective_concurrency(device)
+        self._warm_up_models()
+
+    def _warm_up_models(self):
+        """Run Whisper and MiniLM once on dummy input so CUDA context setup, cuDNN
+        autotuning and lazy allocations happen at startup rather than in the first job."""
+        start = time.monotonic()
+        try:
+            # transcribe() is lazy; draining the segments forces the encode/decode
+            segments, _ = self.whisper.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+            for _ in segments:
+                pass
+            self.text_embedder.encode(["warm up"])
+        except Exception as e:
+            log.warning(f"Model warm-up failed: {e}")
+            return
+        log.info("Models warmed up in %.1fs", time.monotonic() - start)
+
     @staticmethod
     def _slugify(name: str) -> str:
-        slug = name.lower().strip()
-        slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-        slug = re.sub(r'[\s-]+', '-', slug)
+        slug = name.lower().strip().translate(_SLUG_TABLE)
+        slug = _SLUG_DASH_RE.sub('-', slug)
         return slug.strip('-') or 'topic'
 
     def _pop_job(self):
@@ -205,13 +553,13 @@ class Worker:
         return {"id": job["id"], "payload": json.dumps(job["payload"]) if isinstance(job["payload"], dict) else job["payload"]}
 
     def run(self):
-        log.info(f"Worker started (max_concurrent={MAX_CONCURRENT})")
+        log.info(f"Worker started (max_concurrent={self.max_concurrent}, configured={MAX_CONCURRENT})")
         # Maps Future -> job_id so we can send heartbeats for running jobs.
         inflight: dict = {}
         last_reclaim_at = 0.0
         last_heartbeat_at = 0.0
 
-        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT) as pool:
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
             while not shutdown:
                 Path("/tmp/health").touch(exist_ok=True)
                 try:
@@ -228,8 +576,7 @@ class Worker:
                     # Send heartbeats for all currently running jobs so the
                     # staleness watchdog does not reclaim them mid-processing.
                     if inflight and now - last_heartbeat_at >= HEARTBEAT_INTERVAL:
-                        for job_id in list(inflight.values()):
-                            self.api.heartbeat_job(job_id)
+                        self.api.heartbeat_jobs(list(inflight.values()))
                         last_heartbeat_at = now
 
                     if now-last_reclaim_at >= 60:
@@ -241,8 +588,9 @@ class Worker:
                             )
                         last_reclaim_at = now
 
-                    if len(inflight) >= MAX_CONCURRENT:
-                        time.sleep(1)
+                    if len(inflight) >= self.max_concurrent:
+                        # Wake as soon as a job finishes; the timeout keeps heartbeats flowing
+                        wait(inflight, timeout=5, return_when=FIRST_COMPLETED)
                         continue
 
                     row = self._pop_job()
@@ -286,16 +634,17 @@ class Worker:
             work_path.mkdir(parents=True, exist_ok=True)
 
             try:
-                # Fetch platform cookie if applicable
-                cookie_str = None
+                # Fetch platform cookie if applicable; one file serves both yt-dlp calls
+                cookie_path = None
                 if platform in ("youtube", "tiktok", "instagram", "twitter"):
                     cookie_str = self._get_cookie(source_id, platform)
                     if cookie_str:
                         log.info("Job %s: using platform cookie for %s", job_id[:8], platform)
+                        cookie_path = _write_cookie_file(work_path / "cookies.txt", cookie_str)
 
                 # Step 0: Fetch source metadata early so failed downloads still have context
                 log.info("Job %s: [step 0/4] fetching source metadata for %s", job_id[:8], url[:80])
-                source_metadata = self.fetch_source_metadata(url, work_path, cookie_str=cookie_str)
+                source_metadata = self.fetch_source_metadata(url, work_path, cookie_path=cookie_path)
                 if source_metadata:
                     duration = source_metadata.get("duration", 0)
                     if MAX_VIDEO_DURATION > 0 and duration > MAX_VIDEO_DURATION:
@@ -330,9 +679,10 @@ class Worker:
                 self._check_cancelled(job_id)
                 log.info("Job %s: [step 1/4] downloading video", job_id[:8])
                 dl_start = time.time()
-                source_file = self.download(url, work_path, cookie_str=cookie_str)
+                info_path = work_path / SOURCE_INFO_FILE
+                source_file = self.download(url, work_path, cookie_path=cookie_path,
+                                            info_path=info_path if info_path.exists() else None)
                 log.info("Job %s: download complete in %.1fs -- %s", job_id[:8], time.time() - dl_start, source_file.name)
-                self._update_source(source_id, status="processing")
 
                 # Step 2: Extract metadata
                 self._check_cancelled(job_id)
@@ -342,6 +692,7 @@ class Worker:
                 if media_metadata:
                     merged_metadata["media_probe"] = media_metadata
                 self._update_source(source_id,
+                    status="processing",
                     title=(source_metadata or {}).get("title") or media_metadata.get("title"),
                     duration_seconds=(source_metadata or {}).get("duration") or media_metadata.get("duration"),
                     metadata=json.dumps(merged_metadata),
@@ -350,13 +701,18 @@ class Worker:
                 # Step 3: Detect scenes and split
                 self._check_cancelled(job_id)
                 log.info("Job %s: [step 3/4] detecting scenes (duration=%.1fs)", job_id[:8], media_metadata.get("duration", 0))
-                segments = self.detect_scenes(source_file, media_metadata.get("duration", 0))
+                # Decoded once: silence detection and Whisper both use the same 16 kHz mono samples
+                try:
+                    audio = self._decode_audio(source_file, media_metadata.get("duration"))
+                except Exception as e:
+                    log.warning("Job %s: audio decode failed, Whisper will decode the file itself: %s", job_id[:8], e)
+                    audio = None
+                segments = self.detect_scenes(source_file, media_metadata.get("duration", 0), audio=audio)
                 log.info("Job %s: detected %d segments", job_id[:8], len(segments))
 
                 # Step 4: Process each segment
                 self._check_cancelled(job_id)
                 log.info("Job %s: [step 4/4] processing %d segments (transcode, transcribe, embed, upload)", job_id[:8], len(segments))
-                clip_ids = []
                 segment_metadata = dict(media_metadata)
                 if source_metadata and source_metadata.get("title"):
                     segment_metadata["title"] = source_metadata.get("title")
@@ -365,34 +721,60 @@ class Worker:
                 segment_metadata["_channel_name"] = (source_metadata or {}).get("uploader") or (source_metadata or {}).get("channel") or ""
                 # Preserve full source metadata so LLM calls have rich context
                 segment_metadata["_source_metadata"] = source_metadata or {}
-                for i, seg in enumerate(segments):
-                    clip_id = self.process_segment(
-                        source_file, source_id, seg, i, work_path, segment_metadata
+                log.info("Job %s: cutting %d segments (%s)", job_id[:8], len(segments), PROCESSING_MODE)
+                # Whisper reads the source directly, so it runs while ffmpeg cuts
+                # clips; CLIP then runs on the same model thread while the segment
+                # loop waits on LLM calls and uploads.
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"models-{job_id[:8]}") as models:
+                    transcribing = models.submit(self._transcribe_segments, source_file, segments, audio)
+                    clip_paths, clip_size = self._transcode_segments(source_file, segments, work_path)
+                    embedding = models.submit(
+                        self._generate_visual_embeddings, clip_paths,
+                        [seg["end"] - seg["start"] for seg in segments],
                     )
-                    if clip_id:
-                        clip_ids.append(clip_id)
-
-                # Mark source complete
-                self._update_source(source_id, status="complete")
-
-                # Mark job complete
+                    transcripts = transcribing.result()
+                    keep = list(range(len(segments)))
+                    if SKIP_EMPTY_TRANSCRIPT_CLIPS:
+                        # Silent segments never reach the LLM, thumbnailing or upload
+                        keep = [i for i in keep if transcripts[i] and transcripts[i].strip()]
+                        if len(keep) < len(segments):
+                            log.info("Job %s: skipping %d segments with no speech", job_id[:8], len(segments) - len(keep))
+                    log.info("Job %s: extracting topics for %d segments via KeyBERT", job_id[:8], len(segments))
+                    topics = self._extract_topics(transcripts, segment_metadata.get("title", ""))
+                    labels = dict(zip(keep, self._label_segments_llm(
+                        [transcripts[i] for i in keep], [topics[i] for i in keep], segment_metadata)))
+                    # Segments are independent and mostly wait on ffmpeg, the LLM and MinIO
+                    with ThreadPoolExecutor(max_workers=SEGMENT_WORKERS,
+                                            thread_name_prefix=f"segments-{job_id[:8]}") as segment_pool:
+                        results = list(segment_pool.map(
+                            lambda i: self.process_segment(
+                                clip_paths[i], source_id, segments[i], i, work_path,
+                                segment_metadata, transcripts[i], topics[i], clip_size, labels[i],
+                            ),
+                            keep,
+                        ))
+                    records = [record for record in results if record]
+                    visual_embs = embedding.result()
+                clip_ids = self._finalize_clips(records, source_id, segment_metadata, visual_embs)
+
+                # Mark job and source complete
                 self._complete_job(job_id, clip_ids)
                 log.info("Job %s complete: %d clips created from %s", job_id[:8], len(clip_ids), url[:80])
 
             except VideoRejected as e:
                 log.info("Job %s rejected: %s", job_id[:8], e)
-                self._fail_or_reject_job(job_id, source_id, str(e), rejected=True)
+                self._fail_or_reject_job(job_id, str(e), rejected=True)
 
             except JobCancelled:
                 log.info("Job %s cancelled by user", job_id[:8])
                 # Job status already set to 'cancelled' by the API; just clean up
 
             except Exception as e:
-                self._handle_job_error(job_id, source_id, e)
+                self._handle_job_error(job_id, e)
 
             finally:
                 # Cleanup working directory
-                subprocess.run(["rm", "-rf", str(work_path)], check=False)
+                shutil.rmtree(work_path, ignore_errors=True)
 
         except Exception as e:
             log.error(f"Fatal error processing job {job_id}: {e}")
@@ -404,21 +786,31 @@ class Worker:
         self.api.update_source(source_id, **fields)
 
     def _get_cookie(self, source_id, platform):
-        """Get decrypted platform cookie."""
-        return self.api.get_cookie(source_id, platform)
+        """Get decrypted platform cookie, reusing a recent lookup for the same source."""
+        key = (source_id, platform)
+        now = time.monotonic()
+        with _cookie_cache_lock:
+            cached = _cookie_cache.get(key)
+        if cached and now - cached[1] < COOKIE_CACHE_SECONDS:
+            return cached[0]
+        cookie = self.api.get_cookie(source_id, platform)
+        with _cookie_cache_lock:
+            for stale in [k for k, (_, ts) in _cookie_cache.items() if now - ts >= COOKIE_CACHE_SECONDS]:
+                del _cookie_cache[stale]
+            _cookie_cache[key] = (cookie, now)
+        return cookie
 
     def _complete_job(self, job_id, clip_ids):
-        """Mark a job as complete."""
+        """Mark a job and its source as complete."""
         self.api.update_job(job_id, "complete",
-            result={"clip_ids": clip_ids, "clip_count": len(clip_ids)})
+            result={"clip_ids": clip_ids, "clip_count": len(clip_ids)}, source_status="complete")
 
-    def _fail_or_reject_job(self, job_id, source_id, error_msg, rejected=False):
+    def _fail_or_reject_job(self, job_id, error_msg, rejected=False):
         """Mark a job as rejected or failed (terminal)."""
         status = "rejected" if rejected else "failed"
-        self.api.update_job(job_id, status, error=error_msg)
-        self.api.update_source(source_id, status=status)
+        self.api.update_job(job_id, status, error=error_msg, source_status=status)
 
-    def _handle_job_error(self, job_id, source_id, error):
+    def _handle_job_error(self, job_id, error):
         """Handle a transient job error: retry or permanently fail."""
         job_info = self.api.get_job(job_id)
         attempts = job_info.get("attempts", 0)
@@ -426,24 +818,22 @@ class Worker:
 
         if attempts < max_attempts:
             delay = RETRY_BASE_DELAY * (2 ** (attempts - 1))
-            run_after = (datetime.utcnow() + timedelta(seconds=delay)).strftime(
-                "%Y-%m-%dT%H:%M:%SZ"
-            )
             log.warning(
                 f"Job {job_id} attempt {attempts}/{max_attempts} failed, "
                 f"retrying in {delay}s: {error}"
             )
-            self.api.update_job(job_id, "queued", error=str(error), run_after=run_after)
-            self.api.update_source(source_id, status="pending")
+            # The API sets run_after from the database clock
+            self.api.update_job(job_id, "queued", error=str(error), retry_after=delay, source_status="pending")
         else:
             log.error(
                 f"Job {job_id} permanently failed after {attempts} attempts: {error}"
             )
-            self.api.update_job(job_id, "failed", error=str(error))
-            self.api.update_source(source_id, status="failed")
+            self.api.update_job(job_id, "failed", error=str(error), source_status="failed")
 
-    def download(self, url: str, work_path: Path, cookie_str: str = None) -> Path:
-        """Download video using yt-dlp."""
+    def download(self, url: str, work_path: Path, cookie_path: Path = None, info_path: Path = None) -> Path:
+        """Download video using yt-dlp. Given the info JSON from fetch_source_metadata
+        as info_path, yt-dlp skips extracting the page again; if that download fails
+        (e.g. the format URLs expired) it is retried from the URL."""
         validate_url(url)
         output_template = str(work_path / "source.%(ext)s")
 
@@ -459,22 +849,24 @@ class Worker:
             "--output", output_template,
             "--no-overwrites",
             "--socket-timeout", "30",
+            "--concurrent-fragments", str(DOWNLOAD_FRAGMENTS),
         ]
 
-        if cookie_str:
-            cookie_file = work_path / "cookies.txt"
-            with os.fdopen(
-                os.open(cookie_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
-            ) as _f:
-                _f.write(cookie_str)
-            cmd += ["--cookies", str(cookie_file)]
+        if cookie_path:
+            cmd += ["--cookies", str(cookie_path)]
 
-        cmd.append(url)
+        if info_path:
+            cmd += ["--load-info-json", str(info_path)]
+        else:
+            cmd.append(url)
 
         log.info(f"Downloading: {url}")
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
 
         if result.returncode != 0:
+            if info_path:
+                log.warning(f"yt-dlp download from saved info failed, retrying from URL: {result.stderr[:300]}")
+                return self.download(url, work_path, cookie_path=cookie_path)
             raise RuntimeError(f"yt-dlp failed: {result.stderr[:500]}")
 
         # Find the downloaded file
@@ -484,8 +876,9 @@ class Worker:
 
         raise RuntimeError("Download completed but no video file found")
 
-    def fetch_source_metadata(self, url: str, work_path: Path, cookie_str: str = None) -> dict:
-        """Fetch source metadata with yt-dlp without downloading media."""
+    def fetch_source_metadata(self, url: str, work_path: Path, cookie_path: Path = None) -> dict:
+        """Fetch source metadata with yt-dlp without downloading media. The raw JSON
+        is also saved as SOURCE_INFO_FILE in work_path for download to reuse."""
         validate_url(url)
         cmd = [
             "yt-dlp",
@@ -496,13 +889,8 @@ class Worker:
             url,
         ]
 
-        if cookie_str:
-            cookie_file = work_path / "cookies_metadata.txt"
-            with os.fdopen(
-                os.open(cookie_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
-            ) as _f:
-                _f.write(cookie_str)
-            cmd += ["--cookies", str(cookie_file)]
+        if cookie_path:
+            cmd += ["--cookies", str(cookie_path)]
 
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=90)
         if result.returncode != 0:
@@ -512,13 +900,37 @@ class Worker:
         try:
             data = json.loads(result.stdout)
             if isinstance(data, dict):
+                (work_path / SOURCE_INFO_FILE).write_text(result.stdout)
                 return data
         except Exception as e:
             log.warning(f"Failed parsing yt-dlp metadata for {url}: {e}")
         return {}
 
     def extract_metadata(self, video_path: Path) -> dict:
-        """Extract video metadata using ffprobe."""
+        """Extract video metadata, reusing an earlier probe of the same unchanged file."""
+        try:
+            st = video_path.stat()
+        except OSError:
+            return self._probe_metadata(video_path)
+        key = (str(video_path), st.st_mtime_ns, st.st_size)
+        with _probe_cache_lock:
+            cached = _probe_cache.get(key)
+        if cached is None:
+            cached = self._probe_metadata(video_path)
+            with _probe_cache_lock:
+                _probe_cache[key] = cached
+                while len(_probe_cache) > PROBE_CACHE_SIZE:
+                    _probe_cache.pop(next(iter(_probe_cache)))
+        return dict(cached)
+
+    def _probe_metadata(self, video_path: Path) -> dict:
+        """Probe video metadata in-process with PyAV, falling back to ffprobe."""
+        if av is not None:
+            try:
+                return self._probe_av(video_path)
+            except Exception as e:
+                log.warning("PyAV probe failed for %s, falling back to ffprobe: %s", video_path.name, e)
+
         cmd = [
             "ffprobe", "-v", "quiet",
             "-print_format", "json",
@@ -547,42 +959,36 @@ class Worker:
             "bitrate": int(fmt.get("bit_rate", 0)),
         }
 
-    def detect_scenes(self, video_path: Path, total_duration: float) -> list:
+    @staticmethod
+    def _probe_av(video_path: Path) -> dict:
+        """Read container/stream headers via libavformat without spawning ffprobe."""
+        with av.open(str(video_path)) as container:
+            video_stream = next((s for s in container.streams if s.type == "video"), None)
+            ctx = video_stream.codec_context if video_stream is not None else None
+            duration = container.duration / av.time_base if container.duration else 0.0
+            return {
+                "title": container.metadata.get("title", video_path.stem),
+                "duration": float(duration),
+                "width": int(ctx.width) if ctx else 0,
+                "height": int(ctx.height) if ctx else 0,
+                "codec": ctx.name if ctx else None,
+                "bitrate": int(container.bit_rate or 0),
+            }
+
+    def detect_scenes(self, video_path: Path, total_duration: float, audio=None) -> list:
         """
-        Find natural split points using audio silence detection.
+        Find natural split points using audio silence detection on decoded PCM.
+        Pass already-decoded samples as audio to skip decoding the file.
         Falls back to fixed-interval splitting if no silence gaps found.
         """
         if total_duration <= MAX_CLIP_SECONDS:
             return [{"start": 0, "end": total_duration}]
 
         try:
-            cmd = [
-                "ffmpeg", "-threads", FFMPEG_THREADS,
-                "-i", str(video_path),
-                "-af", f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_DURATION}",
-                "-f", "null", "-",
-            ]
-
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=120
-            )
-
-            silence_midpoints = []
-            silence_start = None
-            for line in result.stderr.split("\n"):
-                if "silence_start:" in line:
-                    try:
-                        silence_start = float(line.split("silence_start:")[1].strip().split()[0])
-                    except (ValueError, IndexError):
-                        silence_start = None
-                elif "silence_end:" in line and silence_start is not None:
-                    try:
-                        silence_end = float(line.split("silence_end:")[1].strip().split()[0])
-                        midpoint = (silence_start + silence_end) / 2
-                        silence_midpoints.append(midpoint)
-                    except (ValueError, IndexError):
-                        pass
-                    silence_start = None
+            if audio is None:
+                audio = self._decode_audio(video_path, total_duration)
+            silences = np.asarray(find_silences(audio), dtype=np.float64).reshape(-1, 2)
+            silence_midpoints = silences.mean(axis=1).tolist()
 
             if silence_midpoints:
                 split_points = [0.0] + silence_midpoints + [total_duration]
@@ -596,17 +1002,68 @@ class Worker:
 
         return self._fixed_split(total_duration)
 
+    def _decode_audio(self, video_path: Path, duration: float | None = None):
+        """Decode the audio track to mono 16 kHz float32 samples in [-1, 1].
+        Samples are read from the pipe straight into one array, sized from the
+        duration when it is known, so an hour of audio is never held twice
+        (pipe chunks plus their joined copy)."""
+        cmd = [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-threads", FFMPEG_THREADS,
+            "-i", str(video_path),
+            "-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE),
+            "-f", "f32le", "pipe:1",
+        ]
+        # A second of headroom so a slightly-long track needn't grow the buffer
+        samples = np.empty(int(((duration or 600) + 1) * AUDIO_SAMPLE_RATE), dtype=np.float32)
+        filled = 0  # bytes
+        timed_out = threading.Event()
+        with tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=err)
+
+            def kill():
+                timed_out.set()
+                proc.kill()
+
+            watchdog = threading.Timer(AUDIO_DECODE_TIMEOUT, kill)
+            watchdog.start()
+            try:
+                with proc.stdout:
+                    while True:
+                        if filled == samples.nbytes:
+                            samples = np.concatenate([samples, np.empty_like(samples)])
+                        n = proc.stdout.readinto(memoryview(samples).cast("B")[filled:])
+                        if not n:
+                            break
+                        filled += n
+                returncode = proc.wait()
+            finally:
+                watchdog.cancel()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, AUDIO_DECODE_TIMEOUT)
+            if returncode != 0:
+                err.seek(0)
+                raise RuntimeError(f"Audio decode failed: {err.read()[-300:]!r}")
+        return samples[:filled // 4]
+
     def _merge_scenes(self, scene_times: list, total_duration: float) -> list:
-        """Merge scene boundaries into clips between MIN and MAX duration."""
+        """Merge scene boundaries (sorted ascending) into clips between MIN and MAX duration."""
         segments = []
         start = 0.0
 
-        for i in range(1, len(scene_times)):
-            duration = scene_times[i] - start
+        i = 1
+        while i < len(scene_times):
+            # Jump straight to the first boundary that could close a segment;
+            # the small slack keeps the exact duration check below authoritative
+            i = bisect_left(scene_times, start + TARGET_CLIP_SECONDS - 1e-6, i)
+            if i == len(scene_times):
+                break
+            end = scene_times[i]
+            duration = end - start
+            i += 1
 
             if duration >= TARGET_CLIP_SECONDS:
                 # This segment is long enough
-                end = scene_times[i]
                 if duration > MAX_CLIP_SECONDS:
                     # Too long, split at target duration
                     while start + TARGET_CLIP_SECONDS < end:
@@ -638,12 +1095,20 @@ class Worker:
             pos = end
         return segments
 
-    def _generate_text_embedding(self, text: str) -> bytes:
-        """Generate a 384-dim text embedding, returned as raw float32 bytes."""
-        if not text or not text.strip():
-            return None
-        vec = self.text_embedder.encode(text[:2000], normalize_embeddings=True)
-        return np.array(vec, dtype=np.float32).tobytes()
+    def _generate_text_embeddings(self, texts: list) -> list:
+        """Generate 384-dim text embeddings for many texts in one batched encode,
+        returned as int8-quantized blobs (None for empty texts)."""
+        embeddings = [None] * len(texts)
+        present = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not present:
+            return embeddings
+        vecs = self.text_embedder.encode(
+            [texts[i][:TEXT_EMBED_MAX_CHARS] for i in present], batch_size=TEXT_EMBED_BATCH_SIZE,
+            normalize_embeddings=True, convert_to_numpy=True,
+        )
+        for i, blob in zip(present, _int8_embedding_blobs(vecs.astype(np.float32, copy=False))):
+            embeddings[i] = blob
+        return embeddings
 
     def _ensure_clip_model(self):
         """Lazy-load CLIP ViT-B-32 on first use (thread-safe)."""
@@ -654,160 +1119,317 @@ class Worker:
                 return
             try:
                 import open_clip
-                model, _, preprocess = open_clip.create_model_and_transforms(
+                import torch
+                model = open_clip.create_model(
                     'ViT-B-32', pretrained='laion2b_s34b_b79k'
                 )
                 model.eval()
-                self._clip_model = model
-                self._clip_preprocess = preprocess
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                model = _reduce_precision(model, device)
+                # Keyframes arrive already scaled and cropped to the input size, so
+                # of CLIP's preprocessing only the normalization is left to apply
+                cfg = getattr(model.visual, "preprocess_cfg", None) or {}
+                dtype = next(model.parameters()).dtype
+                self._clip_norm = tuple(
+                    torch.tensor(v, device=device, dtype=dtype).view(1, 3, 1, 1)
+                    for v in (cfg.get("mean", open_clip.OPENAI_DATASET_MEAN),
+                              cfg.get("std", open_clip.OPENAI_DATASET_STD))
+                )
+                self._clip_device = device
                 self._clip_tokenizer = open_clip.get_tokenizer('ViT-B-32')
-                log.info("CLIP ViT-B-32 model loaded")
+                self._clip_model = model
+                log.info("CLIP ViT-B-32 model loaded on %s", device)
             except Exception as e:
                 log.warning(f"CLIP model load failed (visual embeddings disabled): {e}")
 
-    def _extract_keyframes(self, clip_path: Path, n: int = 3) -> list:
-        """Extract n keyframes from a clip at evenly-spaced timestamps."""
-        from PIL import Image
-        import io
-
-        meta = self.extract_metadata(clip_path)
-        duration = meta.get("duration", 0)
+    def _extract_keyframes(self, clip_path: Path, n: int = 3, duration: float | None = None,
+                           intra_only: bool = False) -> list:
+        """Extract n keyframes from a clip at evenly-spaced timestamps.
+        A single ffmpeg pass seeks to the first timestamp, selects the frames,
+        scales/crops them to CLIP's input size and pipes them out as raw RGB.
+        Pass the known clip duration to skip probing the file. With intra_only
+        only the clip's I-frames are decoded, and the first one at or after each
+        timestamp is taken (fewer frames if they are sparse). Returns the frames
+        as KEYFRAME_SIZE x KEYFRAME_SIZE RGB uint8 arrays."""
+        if duration is None:
+            duration = self.extract_metadata(clip_path).get("duration", 0)
         if duration <= 0:
             return []
 
-        frames = []
         positions = [duration * (i + 1) / (n + 1) for i in range(n)]
-        for ts in positions:
-            try:
-                cmd = [
-                    "ffmpeg", "-y", "-ss", str(ts),
-                    "-i", str(clip_path),
-                    "-frames:v", "1", "-f", "image2pipe",
-                    "-vcodec", "png", "pipe:1",
-                ]
-                result = subprocess.run(cmd, capture_output=True, timeout=15)
-                if result.returncode == 0 and result.stdout:
-                    img = Image.open(io.BytesIO(result.stdout)).convert("RGB")
-                    frames.append(img)
-            except Exception:
-                continue
+        first = positions[0]
+        # Timestamps restart at 0 after the input seek; the first frame decoded is the first keyframe
+        select = "+".join(
+            "eq(n,0)" if i == 0 else f"gte(t,{ts - first:.3f})*lt(prev_pts*TB,{ts - first:.3f})"
+            for i, ts in enumerate(positions)
+        )
+        size = KEYFRAME_SIZE
+        cmd = ["ffmpeg", "-nostdin", "-v", "error", "-threads", FFMPEG_THREADS]
+        if intra_only:
+            # With only I-frames to decode, read on to the end rather than
+            # stopping a second past the last position
+            cmd += ["-skip_frame", "nokey", "-ss", f"{first:.3f}", "-i", str(clip_path)]
+        else:
+            cmd += ["-ss", f"{first:.3f}", "-i", str(clip_path), "-t", f"{positions[-1] - first + 1:.3f}"]
+        cmd += [
+            "-an",
+            "-vf", f"select='{select}',scale={size}:{size}:force_original_aspect_ratio=increase,crop={size}:{size}",
+            "-fps_mode", "passthrough",
+            "-frames:v", str(n),
+            "-pix_fmt", "rgb24", "-f", "rawvideo", "pipe:1",
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=30)
+        except Exception as e:
+            log.warning(f"Keyframe extraction failed for {clip_path.name}: {e}")
+            return []
+        frame_bytes = size * size * 3
+        count = len(result.stdout) // frame_bytes
+        if result.returncode != 0 or count == 0:
+            return []
+        arr = np.frombuffer(result.stdout[:count * frame_bytes], dtype=np.uint8).reshape(count, size, size, 3)
+        return list(arr)
+
+    @staticmethod
+    def _written_keyframes(clip_path: Path) -> list:
+        """Load the CLIP keyframes _transcode_segments wrote next to a clip as RGB uint8 arrays."""
+        from PIL import Image
+
+        frames = []
+        for path in sorted(clip_path.parent.glob(f"{clip_path.stem}_key*.jpg")):
+            with Image.open(path) as img:
+                frames.append(np.asarray(img.convert("RGB")))
+        return frames
+
+    def _keyframe_inputs(self, clip_path: Path | None, duration: float | None) -> list:
+        """Load a clip's CLIP keyframes as RGB uint8 arrays. Keyframes the
+        transcode pass already wrote are used as-is; otherwise the clip is decoded again."""
+        if clip_path is None:
+            return []
+        frames = self._written_keyframes(clip_path)
+        if not frames:
+            # Stream-copied clips: the I-frames nearest the positions are close
+            # enough for CLIP and far cheaper to decode than every frame; fall
+            # back to a full decode when the GOPs are too long to cover them all
+            frames = self._extract_keyframes(clip_path, n=KEYFRAMES_PER_CLIP, duration=duration, intra_only=True)
+            if len(frames) < KEYFRAMES_PER_CLIP:
+                frames = self._extract_keyframes(clip_path, n=KEYFRAMES_PER_CLIP, duration=duration)
         return frames
 
-    def _generate_visual_embedding(self, clip_path: Path) -> bytes:
-        """Generate a 512-dim CLIP visual embedding by averaging keyframe embeddings."""
+    def _generate_visual_embeddings(self, clip_paths: list, durations: list | None = None) -> list:
+        """Generate 512-dim CLIP visual embeddings for many clips at once. Keyframes
+        from every clip are encoded in batched forward passes, then averaged per clip.
+        Keyframes are loaded on a few threads, and each batch is
+        sent to the model as soon as it fills, so preparing the next batch overlaps
+        the current forward pass. Returns a bfloat16 blob per clip (None where no
+        frames could be read)."""
+        embeddings = [None] * len(clip_paths)
         self._ensure_clip_model()
         if self._clip_model is None:
-            return None
+            return embeddings
 
         import torch
 
-        frames = self._extract_keyframes(clip_path, n=3)
-        if not frames:
-            return None
-
+        durations = durations or [None] * len(clip_paths)
         try:
-            images = torch.stack([self._clip_preprocess(f) for f in frames])
-            with torch.no_grad():
-                feats = self._clip_model.encode_image(images)
-                feats = feats / feats.norm(dim=-1, keepdim=True)
-            avg = feats.mean(dim=0)
-            avg = avg / avg.norm()
-            return avg.cpu().numpy().astype(np.float32).tobytes()
+            device = self._clip_device
+            dtype = next(self._clip_model.parameters()).dtype
+            mean, std = self._clip_norm
+            feats, owners, pending = [], [], []
+
+            def encode(images):
+                # uint8 NHWC goes over as-is (a quarter of the float32 bytes) and is
+                # scaled and normalized on the device
+                batch = torch.from_numpy(np.stack(images)).to(device, non_blocking=True)
+                batch = batch.permute(0, 3, 1, 2).to(dtype).div_(255).sub_(mean).div_(std)
+                f = self._clip_model.encode_image(batch).float()
+                feats.append(f / f.norm(dim=-1, keepdim=True))
+
+            with torch.inference_mode(), \
+                    ThreadPoolExecutor(max_workers=SEGMENT_WORKERS, thread_name_prefix="keyframes") as loaders:
+                for i, inputs in enumerate(loaders.map(self._keyframe_inputs, clip_paths, durations)):
+                    pending.extend(inputs)
+                    owners.extend([i] * len(inputs))
+                    while len(pending) >= CLIP_BATCH_SIZE:
+                        encode(pending[:CLIP_BATCH_SIZE])
+                        del pending[:CLIP_BATCH_SIZE]
+                if pending:
+                    encode(pending)
+                if not feats:
+                    return embeddings
+                feats = torch.cat(feats)
+                # Sum each clip's unit vectors then renormalize (same direction as the mean)
+                owner_idx = torch.tensor(owners, device=feats.device)
+                pooled = torch.zeros(len(clip_paths), feats.shape[1], device=feats.device)
+                pooled.index_add_(0, owner_idx, feats)
+                pooled = pooled / pooled.norm(dim=-1, keepdim=True).clamp_min(1e-12)
+            pooled = pooled.cpu().numpy()  # already float32 (features are upcast with .float())
+            blobs = _bf16_embedding_blobs(pooled)
+            for i in set(owners):
+                embeddings[i] = blobs[i]
         except Exception as e:
             log.warning(f"Visual embedding generation failed: {e}")
-            return None
-
-    def _extract_topics(self, transcript: str, source_title: str = "") -> list:
-        """Extract key topics from transcript using KeyBERT."""
-        if not transcript or len(transcript.split()) < 10:
-            return []
-        text = f"{source_title}\n{transcript}".strip()
+        return embeddings
+
+    def _extract_topics(self, transcripts: list, source_title: str = "") -> list:
+        """Extract key topics for every clip of a job using KeyBERT.
+        All transcripts go through one list-form call, so the candidate
+        vocabulary is built once and documents and candidates are embedded in
+        batched passes. Returns a topic list per transcript."""
+        topics = [[] for _ in transcripts]
+        present = [i for i, t in enumerate(transcripts) if t and len(t.split()) >= 10]
+        if not present:
+            return topics
+        # Text past MiniLM's window never reaches the document embedding, so it
+        # would only add candidate phrases to embed and score
+        docs = [f"{source_title}\n{transcripts[i]}".strip()[:TEXT_EMBED_MAX_CHARS] for i in present]
         try:
             keywords = self.kw_model.extract_keywords(
-                text, keyphrase_ngram_range=(1, 2), stop_words='english',
+                docs, keyphrase_ngram_range=(1, 2), stop_words='english',
                 top_n=5, diversity=0.5, use_mmr=True,
             )
-            return [kw for kw, score in keywords if score > 0.25][:5]
+            if len(docs) == 1:
+                # KeyBERT unwraps single-document results
+                keywords = [keywords]
+            for i, kws in zip(present, keywords):
+                topics[i] = [kw for kw, score in kws if score > 0.25][:5]
         except Exception as e:
             log.warning(f"Topic extraction failed: {e}")
-            return []
+        return topics
 
     def process_segment(
-        self, source_file: Path, source_id: str,
-        segment: dict, index: int, work_path: Path, metadata: dict
-    ) -> str:
-        """Process a single clip segment: transcode, thumbnail, transcribe, upload."""
+        self, clip_path: Path | None, source_id: str,
+        segment: dict, index: int, work_path: Path, metadata: dict, transcript: str = "",
+        topics: list | None = None, clip_size: tuple | None = None, label: dict | None = None,
+    ) -> dict | None:
+        """Process a single cut clip: thumbnail, tag, upload. clip_size is the
+        (width, height) the transcode reported; the clip is probed without it.
+        label holds the title/topics from the batched LLM pass, if it answered.
+        Returns a clip record for _finalize_clips, or None if the segment failed."""
         clip_id = str(uuid.uuid4())
         start = segment["start"]
         end = segment["end"]
         duration = end - start
 
-        clip_filename = f"clip_{index:04d}.mp4"
-        clip_path = work_path / clip_filename
         thumb_path = work_path / f"thumb_{index:04d}.jpg"
 
         try:
-            # Transcode segment to vertical-friendly format
-            log.info("Segment %d: transcoding %.1fs-%.1fs (%.1fs)", index, start, end, duration)
-            self._transcode_clip(source_file, clip_path, start, duration, metadata)
-
-            # Generate thumbnail
-            self._generate_thumbnail(clip_path, thumb_path)
+            if clip_path is None:
+                raise RuntimeError(f"no clip produced for {start:.1f}s-{end:.1f}s")
+            clip_filename = clip_path.name
 
-            # Transcribe audio
-            log.info("Segment %d: transcribing audio", index)
-            transcript = self._transcribe(clip_path)
-            log.info("Segment %d: transcript length=%d words", index, len(transcript.split()) if transcript else 0)
+            # The transcode pass already wrote it unless stream-copying
+            has_thumb = thumb_path.exists() or self._generate_thumbnail(clip_path, thumb_path, duration)
 
-            # Generate a title from the transcript or source (reused for embedding context below)
-            title = self._generate_clip_title(transcript, metadata.get("title", ""), index, metadata)
-
-            # Extract topics
-            log.info("Segment %d: extracting topics via KeyBERT", index)
-            topics = self._extract_topics(transcript, metadata.get("title", ""))
-            log.info("Segment %d: KeyBERT topics=%s", index, topics)
-            topics = self._refine_topics_llm(transcript, topics, metadata)
+            clip_prefix = f"clips/{clip_id}/"
+            clip_key = clip_prefix + clip_filename
+            # A clip without a thumbnail is still usable; the feed just shows no poster
+            thumb_key = clip_prefix + "thumbnail.jpg" if has_thumb else ""
 
-            # Generate embeddings
-            log.info("Segment %d: generating embeddings (text + visual)", index)
-            text_emb = self._generate_text_embedding(f"{title} {transcript}")
-            visual_emb = self._generate_visual_embedding(clip_path)
+            file_size = os.stat(clip_path).st_size
 
-            clip_key = f"clips/{clip_id}/{clip_filename}"
-            thumb_key = f"clips/{clip_id}/thumbnail.jpg"
+            # Uploads run in the background while the clip is tagged and probed
+            clip_upload = self._io_pool.submit(self._upload_object, clip_key, clip_path, "video/mp4")
+            thumb_upload = (self._io_pool.submit(self._upload_object, thumb_key, thumb_path, "image/jpeg")
+                            if has_thumb else None)
 
-            file_size = clip_path.stat().st_size
+            log.info("Segment %d: transcript length=%d words", index, len(transcript.split()) if transcript else 0)
 
-            self.minio.fput_object(MINIO_BUCKET, clip_key, str(clip_path), content_type="video/mp4")
+            log.info("Segment %d: KeyBERT topics=%s", index, topics)
+            label = label or {}
+            if "topics" in label:
+                topics = label["topics"]
+            else:
+                topics = self._refine_topics_llm(transcript, topics or [], metadata)
+
+            if clip_size:
+                width, height = clip_size
+            else:
+                clip_meta = self.extract_metadata(clip_path)
+                width, height = clip_meta.get("width", 0), clip_meta.get("height", 0)
+
+            clip_upload.result()
+            if thumb_upload is not None:
+                thumb_upload.result()
+
+            return {
+                "clip_id": clip_id,
+                "index": index,
+                "start": start,
+                "end": end,
+                "duration": duration,
+                "storage_key": clip_key,
+                "thumbnail_key": thumb_key,
+                "width": width,
+                "height": height,
+                "file_size_bytes": file_size,
+                "title": label.get("title", ""),
+                "transcript": transcript,
+                "topics": topics,
+                "clip_path": clip_path,
+            }
 
-            if thumb_path.exists():
-                self.minio.fput_object(MINIO_BUCKET, thumb_key, str(thumb_path), content_type="image/jpeg")
+        except Exception as e:
+            log.error(f"Failed to process segment {index}: {e}")
+            return None
 
-            # Probe the output clip for dimensions
-            clip_meta = self.extract_metadata(clip_path)
+    def _upload_object(self, key: str, path: Path, content_type: str):
+        """Upload a file to the clips bucket. Files larger than UPLOAD_PART_SIZE
+        go up as a multipart upload with parts sent in parallel."""
+        self.minio.fput_object(
+            MINIO_BUCKET, key, str(path), content_type=content_type,
+            part_size=UPLOAD_PART_SIZE, num_parallel_uploads=UPLOAD_PARALLEL_PARTS,
+        )
 
-            expires_at = (datetime.utcnow() + timedelta(days=CLIP_TTL_DAYS)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    def _finalize_clips(self, records: list, source_id: str, metadata: dict,
+                        visual_embs: list | None = None) -> list:
+        """Title, embed, score and register a source's processed segments in one
+        post-pass. visual_embs, if already computed, is indexed by segment index.
+        Returns the ids of the clips created."""
+        if not records:
+            return []
 
-            platform = metadata.get("_platform", "")
-            channel_name = metadata.get("_channel_name", "")
+        source_title = metadata.get("title", "")
+        for rec in records:
+            # Clips the batched LLM pass didn't title get one of their own
+            rec["title"] = rec.get("title") or self._generate_clip_title(
+                rec["transcript"], source_title, rec["index"], metadata)
+        scores = self._score_clips(records)
+        log.info("Generating text and visual embeddings for %d clips", len(records))
+        try:
+            # Cut the transcript before joining so long talks aren't copied whole
+            text_embs = self._generate_text_embeddings([
+                f"{rec['title']} {rec['transcript'][:TEXT_EMBED_MAX_CHARS]}" for rec in records
+            ])
+        except Exception as e:
+            log.warning(f"Text embedding generation failed: {e}")
+            text_embs = [None] * len(records)
+        if visual_embs is None:
+            visual_embs = self._generate_visual_embeddings(
+                [rec["clip_path"] for rec in records], [rec["duration"] for rec in records]
+            )
+        else:
+            visual_embs = [visual_embs[rec["index"]] for rec in records]
 
-            content_score = 0.5
+        expires_at = (datetime.utcnow() + timedelta(days=CLIP_TTL_DAYS)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        platform = metadata.get("_platform", "")
+        channel_name = metadata.get("_channel_name", "")
 
-            # Single API call creates clip + topics + embeddings + FTS
-            self.api.create_clip(
-                clip_id=clip_id,
+        clips = [
+            dict(
+                clip_id=rec["clip_id"],
                 source_id=source_id,
-                title=title,
-                duration_seconds=duration,
-                start_time=start,
-                end_time=end,
-                storage_key=clip_key,
-                thumbnail_key=thumb_key,
-                width=clip_meta.get("width", 0),
-                height=clip_meta.get("height", 0),
-                file_size_bytes=file_size,
-                transcript=transcript,
-                topics=topics,
+                title=rec["title"],
+                duration_seconds=rec["duration"],
+                start_time=rec["start"],
+                end_time=rec["end"],
+                storage_key=rec["storage_key"],
+                thumbnail_key=rec["thumbnail_key"],
+                width=rec["width"],
+                height=rec["height"],
+                file_size_bytes=rec["file_size_bytes"],
+                transcript=rec["transcript"],
+                topics=rec["topics"],
                 content_score=content_score,
                 expires_at=expires_at,
                 platform=platform,
@@ -816,84 +1438,247 @@ class Worker:
                 visual_embedding=visual_emb,
                 model_version="minilm-v2+clip-vit-b32",
             )
+            for rec, content_score, text_emb, visual_emb in zip(records, scores, text_embs, visual_embs)
+        ]
+        # Bulk requests create clips + topics + embeddings + FTS; the API skips
+        # clips it cannot insert and returns the ids it created, and the rest
+        # (or a whole failed request) are retried per clip
+        created = set(self.api.create_clips(clips))
+        clip_ids = []
+        for rec, clip in zip(records, clips):
+            if rec["clip_id"] not in created:
+                try:
+                    self.api.create_clip(**clip)
+                except Exception as e:
+                    log.error(f"Failed to create clip for segment {rec['index']}: {e}")
+                    continue
+            clip_ids.append(rec["clip_id"])
+            log.info(f"Clip {rec['clip_id']} created ({rec['duration']:.1f}s, "
+                     f"score={clip['content_score']:.2f}, topics={rec['topics']})")
+        return clip_ids
 
-            log.info(f"Clip {clip_id} created ({duration:.1f}s, topics={topics})")
-            return clip_id
+    @staticmethod
+    def _score_clips(records: list) -> list:
+        """Compute the initial content_score for every clip in one vectorized pass."""
+        features = np.array(
+            [[len(r["transcript"].split()) / max(r["duration"], 1.0), len(r["topics"])] for r in records],
+            dtype=np.float64,
+        )
+        z = (features - np.array(CONTENT_SCORE_BASELINE)) @ np.array(CONTENT_SCORE_WEIGHTS)
+        return [round(float(v), 4) for v in 1.0 / (1.0 + np.exp(-z))]
+
+    def _transcode_segments(self, source: Path, segments: list, work_path: Path, encoder: str | None = None) -> tuple:
+        """Cut every segment out of the source in a single ffmpeg pass using the
+        segment muxer, so the source is demuxed and decoded once, and transcode
+        the clips for mobile viewing. The same pass also writes each segment's
+        middle frame as thumb_NNNN.jpg and its CLIP keyframes as
+        clip_NNNN_keyK.jpg. A failed hardware encode is retried once with
+        libx264. Copy mode goes through _copy_segments instead. Returns the clip
+        path for each segment (None where ffmpeg produced no piece) and the clips'
+        (width, height) as ffmpeg reported it, or None if it couldn't be read."""
+        if PROCESSING_MODE == "copy":
+            return self._copy_segments(source, segments, work_path)
+
+        bounds = sorted({seg["start"] for seg in segments} | {seg["end"] for seg in segments})
+        # Input-seek past any lead-in before the first segment; output timestamps
+        # (and so the cut times) are then relative to it
+        origin = bounds[0]
+        cuts = bounds[1:-1]
+        piece_index = {t: k for k, t in enumerate(bounds[:-1])}
+        times = ",".join(f"{t - origin:.3f}" for t in cuts)
+
+        encoder = encoder or self.video_encoder
+        # Info level so the output stream listing (and so the clip size) is on stderr
+        cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-nostats", "-v", "info", "-y", "-threads", FFMPEG_THREADS]
+        cmd += _ENCODER_DEVICE_ARGS.get(encoder, ())
+        if encoder in _ENCODER_HWACCEL:
+            cmd += ["-hwaccel", _ENCODER_HWACCEL[encoder]]
+        if origin > 0:
+            cmd += ["-ss", f"{origin:.3f}"]
+        cmd += ["-t", f"{bounds[-1] - origin:.3f}", "-i", str(source)]
+        thumb_order = sorted(range(len(segments)), key=lambda i: segments[i]["start"] + segments[i]["end"])
+        # (time, segment, keyframe) for the KEYFRAMES_PER_CLIP evenly spaced frames of each segment
+        key_order = sorted(
+            (seg["start"] + (seg["end"] - seg["start"]) * (j + 1) / (KEYFRAMES_PER_CLIP + 1) - origin, i, j)
+            for i, seg in enumerate(segments) for j in range(KEYFRAMES_PER_CLIP)
+        )
+        # A second branch picks the frame at each segment's midpoint for its
+        # thumbnail, a third the CLIP keyframes, so neither needs the clips
+        # decoded again
+        mids = [(segments[i]["start"] + segments[i]["end"]) / 2 - origin for i in thumb_order]
+        select = "+".join(f"gte(t,{m:.3f})*lt(prev_pts*TB,{m:.3f})" for m in mids)
+        key_select = "+".join(f"gte(t,{t:.3f})*lt(prev_pts*TB,{t:.3f})" for t, _, _ in key_order)
+        size = KEYFRAME_SIZE
+        cmd += [
+            "-filter_complex",
+            f"[0:v]split=3[v][t][k];[v]{_CLIP_SCALE_FILTER}{_ENCODER_UPLOAD_FILTER.get(encoder, '')}[vclip];"
+            f"[t]select='{select}',scale=480:-1[vthumb];"
+            f"[k]select='{key_select}',scale={size}:{size}:force_original_aspect_ratio=increase,crop={size}:{size}[vkey]",
+            "-map", "[vclip]", "-map", "0:a:0?",
+            "-c:v", encoder,
+            *_ENCODER_ARGS.get(encoder, []),
+            # Encoder threads; the -threads before -i covers the decoder
+            "-threads", FFMPEG_THREADS,
+            *_CLIP_AUDIO_ARGS,
+        ]
+        if cuts:
+            # Keyframes exactly at the cut points so pieces start where segments do;
+            # the delta lets the muxer accept them despite B-frame and AAC-priming
+            # timestamp shifts
+            cmd += ["-force_key_frames", times, "-segment_time_delta", "0.1"]
+        cmd += _SEGMENT_MUXER_ARGS
+        if cuts:
+            cmd += ["-segment_times", times]
+        cmd.append(str(work_path / "piece_%04d.mp4"))
+        cmd += [
+            "-map", "[vthumb]", "-fps_mode", "passthrough", "-frames:v", str(len(segments)),
+            "-start_number", "0", str(work_path / "frame_%04d.jpg"),
+            "-map", "[vkey]", "-fps_mode", "passthrough", "-frames:v", str(len(key_order)),
+            "-q:v", "2", "-start_number", "0", str(work_path / "key_%04d.jpg"),
+        ]
 
-        except Exception as e:
-            log.error(f"Failed to process segment {index}: {e}")
-            return None
+        result = _run_ffmpeg(cmd, timeout=300 * max(1, len(segments)), keep=_STREAM_LISTING_RE)
+        if result.returncode != 0:
+            if encoder != "libx264":
+                log.warning("%s transcode failed, retrying with libx264: %s", encoder, result.stderr[-300:])
+                for partial in [*work_path.glob("piece_*.mp4"), *work_path.glob("frame_*.jpg"),
+                                *work_path.glob("key_*.jpg")]:
+                    partial.unlink(missing_ok=True)
+                return self._transcode_segments(source, segments, work_path, encoder="libx264")
+            raise RuntimeError(f"Transcode failed: {result.stderr[-500:]}")
 
-    def _transcode_clip(
-        self, source: Path, output: Path,
-        start: float, duration: float, metadata: dict
-    ):
-        """Transcode or copy a segment, optimized for mobile viewing or speed."""
-        if PROCESSING_MODE == "copy":
+        # Frames come out in midpoint order; name them after their segment
+        for k, i in enumerate(thumb_order):
+            frame = work_path / f"frame_{k:04d}.jpg"
+            if frame.exists():
+                frame.rename(work_path / f"thumb_{i:04d}.jpg")
+        for k, (_, i, j) in enumerate(key_order):
+            frame = work_path / f"key_{k:04d}.jpg"
+            if frame.exists():
+                frame.rename(work_path / f"clip_{i:04d}_key{j}.jpg")
+
+        clip_paths = []
+        for i, seg in enumerate(segments):
+            piece = work_path / f"piece_{piece_index[seg['start']]:04d}.mp4"
+            clip_path = work_path / f"clip_{i:04d}.mp4"
+            if piece.exists():
+                piece.rename(clip_path)
+                clip_paths.append(clip_path)
+            else:
+                clip_paths.append(None)
+        # Pieces not backing a segment (gaps between segments) aren't needed
+        for leftover in work_path.glob("piece_*.mp4"):
+            leftover.unlink(missing_ok=True)
+        size = _OUTPUT_SIZE_RE.search(result.stderr or "")
+        return clip_paths, (int(size.group(1)), int(size.group(2))) if size else None
+
+    def _copy_segments(self, source: Path, segments: list, work_path: Path) -> tuple:
+        """Stream-copy each segment with its own input seek. Copied video can only
+        be cut on the source's keyframes, so the segment muxer would write a
+        single piece for cut points that share a GOP and shift every later piece
+        onto the wrong segment; one cut per segment keeps each clip tied to its
+        segment. Returns the same (clip paths, clip size) as _transcode_segments."""
+        clip_paths = []
+        size = None
+        for i, seg in enumerate(segments):
+            clip_path = work_path / f"clip_{i:04d}.mp4"
             cmd = [
-                "ffmpeg", "-y",
-                "-ss", str(start),
+                "ffmpeg", "-nostdin", "-hide_banner", "-nostats", "-v", "info", "-y",
+                "-ss", f"{seg['start']:.3f}",
                 "-i", str(source),
-                "-t", str(duration),
+                "-t", f"{seg['end'] - seg['start']:.3f}",
                 "-c", "copy",
-                "-movflags", "+faststart",
-                str(output),
-            ]
-        else:
-            # Keep aspect ratio, target 720p max
-            scale_filter = "scale='min(720,iw)':'min(1280,ih)':force_original_aspect_ratio=decrease,pad=ceil(iw/2)*2:ceil(ih/2)*2"
-
-            cmd = [
-                "ffmpeg", "-y",
-                "-threads", FFMPEG_THREADS,
-                "-ss", str(start),
-                "-i", str(source),
-                "-t", str(duration),
-                "-vf", scale_filter,
-                "-c:v", "libx264",
-                "-preset", "fast",
-                "-crf", "23",
-                "-threads", FFMPEG_THREADS,
-                "-c:a", "aac",
-                "-b:a", "128k",
-                "-movflags", "+faststart",
                 "-avoid_negative_ts", "make_zero",
-                str(output),
+                "-movflags", "+faststart",
+                str(clip_path),
             ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        if result.returncode != 0:
-            raise RuntimeError(f"Transcode failed: {result.stderr[-500:]}")
-
-    def _generate_thumbnail(self, clip_path: Path, thumb_path: Path):
-        """Generate a thumbnail from the middle of the clip."""
+            result = _run_ffmpeg(cmd, timeout=300, keep=_STREAM_LISTING_RE)
+            if result.returncode != 0 or not clip_path.exists():
+                log.warning("Copying segment %d failed: %s", i, result.stderr[-300:])
+                clip_path.unlink(missing_ok=True)
+                clip_paths.append(None)
+                continue
+            clip_paths.append(clip_path)
+            if size is None:
+                match = _OUTPUT_SIZE_RE.search(result.stderr or "")
+                size = (int(match.group(1)), int(match.group(2))) if match else None
+        if segments and not any(clip_paths):
+            raise RuntimeError("Copy failed for every segment")
+        return clip_paths, size
+
+    def _generate_thumbnail(self, clip_path: Path, thumb_path: Path, duration: float) -> bool:
+        """Generate a thumbnail from the middle of the clip. Seeks straight to the
+        midpoint so only the frames from the preceding keyframe get decoded.
+        Returns whether a thumbnail was written."""
         cmd = [
             "ffmpeg", "-y",
             "-threads", FFMPEG_THREADS,
+            "-ss", f"{duration / 2:.3f}",
             "-i", str(clip_path),
-            "-vf", "thumbnail,scale=480:-1",
+            "-vf", "scale=480:-1",
             "-frames:v", "1",
+            "-q:v", "3",
             str(thumb_path),
         ]
-        subprocess.run(cmd, capture_output=True, timeout=60)
-
-    def _transcribe(self, clip_path: Path) -> str:
-        """Transcribe audio using faster-whisper."""
         try:
-            segments, _ = self.whisper.transcribe(str(clip_path), language="en")
-            return " ".join(seg.text.strip() for seg in segments)
+            result = _run_ffmpeg(cmd, timeout=THUMBNAIL_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            log.warning("Thumbnail for %s timed out after %ds", clip_path.name, THUMBNAIL_TIMEOUT)
+            return False
+        if result.returncode != 0:
+            log.warning("Thumbnail for %s failed: %s", clip_path.name, result.stderr[-200:])
+            return False
+        return thumb_path.exists()
+
+    def _transcribe_segments(self, source_file: Path, segments: list, audio=None) -> list:
+        """Transcribe the whole source in one (batched) Whisper pass and split the
+        text per segment: each Whisper segment goes to the clip containing its midpoint.
+        Pass the decoded 16 kHz samples as audio so Whisper doesn't decode the file again."""
+        texts = [[] for _ in segments]
+        if not segments:
+            return []
+        log.info("Transcribing source audio for %d segments (batched=%s)",
+                 len(segments), self.batched_whisper is not None)
+        source = audio if audio is not None else str(source_file)
+        # WHISPER_VAD_PARAMETERS and WHISPER_TEMPERATURES apply to both paths. The
+        # 500 ms min silence is longer than the batched pipeline's 160 ms default
+        # (fewer, longer chunks) and shorter than the sequential path's 2 s.
+        try:
+            if self.batched_whisper is not None:
+                # Batched chunks are decoded independently, with no previous text
+                result, _ = self.batched_whisper.transcribe(
+                    source, language="en",
+                    batch_size=self.whisper_batch_size, without_timestamps=False,
+                    vad_parameters=WHISPER_VAD_PARAMETERS, temperature=WHISPER_TEMPERATURES,
+                )
+            else:
+                # The batched pipeline always runs VAD; skip silence here too.
+                # Not conditioning on the previous window (sequential path only)
+                # keeps a hallucinated line from repeating through the source.
+                result, _ = self.whisper.transcribe(
+                    source, language="en", vad_filter=True, vad_parameters=WHISPER_VAD_PARAMETERS,
+                    temperature=WHISPER_TEMPERATURES, condition_on_previous_text=False,
+                )
+
+            starts = [seg["start"] for seg in segments]
+            for ws in result:
+                mid = (ws.start + ws.end) / 2
+                idx = bisect_right(starts, mid) - 1
+                if idx >= 0 and mid < segments[idx]["end"]:
+                    texts[idx].append(ws.text.strip())
         except Exception as e:
             log.warning(f"Transcription failed: {e}")
-            return ""
+        return [" ".join(t) for t in texts]
 
     def _generate_clip_title(self, transcript: str, source_title: str, index: int, metadata: dict | None = None) -> str:
         """Generate a title via LLM if available, otherwise fall back to heuristics."""
         try:
-            from llm_client import generate_title
+            if llm_client is None:
+                raise ImportError("llm_client unavailable")
             log.info("[LLM] Generating title for segment %d via LLM (source=%r, transcript_len=%d)",
                      index, source_title[:60] if source_title else "", len(transcript or ""))
             video_metadata = (metadata or {}).get("_source_metadata") or None
-            llm_title = generate_title(transcript, source_title, video_metadata=video_metadata)
+            llm_title = llm_client.generate_title(transcript, source_title, video_metadata=video_metadata)
             if llm_title and len(llm_title) > 3:
                 log.info("[LLM] Title generated for segment %d: %r", index, llm_title)
                 return llm_title
@@ -915,15 +1700,41 @@ class Worker:
 
         return f"Clip {index + 1}"
 
+    def _label_segments_llm(self, transcripts: list, topics: list, metadata: dict) -> list:
+        """Title every segment and refine its KeyBERT topics in batched LLM calls.
+        Returns a dict per segment with the 'title' and/or 'topics' the LLM gave;
+        segments left without one fall back to per-segment calls."""
+        labels = [{} for _ in transcripts]
+        if not transcripts:
+            return labels
+        try:
+            if llm_client is None:
+                raise ImportError("llm_client unavailable")
+            video_metadata = metadata.get("_source_metadata") or None
+            results = llm_client.generate_titles_and_topics(
+                [{"transcript": t, "keybert_topics": k} for t, k in zip(transcripts, topics)],
+                metadata.get("title", ""), video_metadata=video_metadata,
+            )
+            for label, result, keybert in zip(labels, results, topics):
+                if len(result.get("title", "")) > 3:
+                    label["title"] = result["title"]
+                # Like _refine_topics_llm, only refine segments KeyBERT tagged
+                if keybert and result.get("topics"):
+                    label["topics"] = result["topics"]
+        except Exception as e:
+            log.warning("[LLM] Batched titling failed: %s -- falling back to per-segment calls", e)
+        return labels
+
     def _refine_topics_llm(self, transcript: str, topics: list, metadata: dict | None = None) -> list:
         """Optionally refine topics via LLM. Returns original on failure."""
         if not topics:
             return topics
         try:
-            from llm_client import refine_topics
+            if llm_client is None:
+                raise ImportError("llm_client unavailable")
             log.info("[LLM] Refining topics via LLM: input=%s", topics)
             video_metadata = (metadata or {}).get("_source_metadata") or None
-            refined = refine_topics(transcript, topics, video_metadata=video_metadata)
+            refined = llm_client.refine_topics(transcript, topics, video_metadata=video_metadata)
             if refined and isinstance(refined, list):
                 log.info("[LLM] Topics refined: %s -> %s", topics, refined)
                 return refined